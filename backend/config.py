@@ -1,4 +1,4 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import AnyUrl
 from typing import List, Optional, Dict, Any
 import secrets
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     # Auth & Security
     auth_secret: str = secrets.token_urlsafe(32)
     refresh_token_secret: str = secrets.token_urlsafe(32)
+    turn_secret: str = secrets.token_urlsafe(32)  # shared with the TURN server
     cookie_secure: bool = False
     cookie_domain: Optional[str] = None
     allowed_origins: List[str] = ["http://localhost:3000"]
@@ -83,9 +84,7 @@ class Settings(BaseSettings):
     cache_responses: bool = True
     max_concurrent_interviews: int = 1000
 
-    class Config:
-        env_file = ".env.local"
-        case_sensitive = False
+    model_config = SettingsConfigDict(env_file=".env.local", case_sensitive=False)
 
 
 settings = Settings()
@@ -19,6 +19,24 @@ async def disconnect() -> None:
         client = None
 
 
+# Indexes backing the hot query paths (recent-sessions lookups, career-path
+# fetches, the skill-assessment bulk upserts, anti-cheat chain tails and
+# live-interview session lookups). create_index is idempotent, so these are
+# safe to ensure on every startup.
+INDEXES = [
+    ("sessions", [("userId", 1), ("createdAt", -1)], {}),
+    ("career_paths", [("userId", 1)], {}),
+    ("skill_assessments", [("userId", 1), ("skillName", 1)], {"unique": True}),
+    ("anti_cheat_events", [("sessionId", 1), ("seq", -1)], {}),
+    ("live_interviews", [("sessionId", 1)], {"unique": True}),
+]
+
+
+async def ensure_indexes() -> None:
+    for collection, keys, opts in INDEXES:
+        await db[collection].create_index(keys, **opts)
+
+
 def get_database() -> AsyncIOMotorDatabase:
     """Get the database instance"""
     global db
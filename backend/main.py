@@ -10,9 +10,10 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import psutil
 import os
+import ssl
 
 from .config import settings
-from .db import connect, disconnect
+from .db import connect, disconnect, ensure_indexes, get_database
 from .routes import auth as auth_routes
 from .routes import interview as interview_routes
 from .routes import media as media_routes
@@ -125,8 +126,14 @@ if settings.environment == "production":
 
 @app.on_event("startup")
 async def on_startup():
+    # hashlib dispatches SHA-256 to OpenSSL, which only uses hardware SHA
+    # extensions if built with them — log the build so slow hashing of media
+    # uploads is diagnosable from startup output
+    logger.info(f"Hashing backed by {ssl.OPENSSL_VERSION}")
+
     try:
         await connect()
+        await ensure_indexes()
     except Exception as e:
         print(f"Failed to connect to database: {e}")
         # Continue without database for now, but log the error
@@ -156,7 +163,6 @@ async def healthz(request: Request):
         disk = psutil.disk_usage('/')
 
         # Database connection check
-        from .db import get_database
         try:
             db = get_database()
             await db.command("ping")
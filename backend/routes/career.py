@@ -1,4 +1,5 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, Request
+from fastapi.responses import JSONResponse
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from typing import List, Dict, Any, Optional
@@ -39,7 +40,9 @@ async def generate_career_path(
             experience_level=career_data.get("experience_level", "entry"),
             timeline_preference=career_data.get("timeline_preference", 12)
         )
-        return career_path
+        # Serialize directly; the model was just built, so FastAPI's
+        # response-model re-validation pass is pure overhead here
+        return JSONResponse(career_path.model_dump(mode="json"))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -76,7 +79,7 @@ async def assess_skills(
 
     try:
         assessments = await career_service.assess_skills(user_id, assessment_data)
-        return assessments
+        return JSONResponse([a.model_dump(mode="json") for a in assessments])
     except Exception as e:
         raise HTTPException(
             status_code=500,
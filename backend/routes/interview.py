@@ -3,13 +3,18 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
 import multiprocessing as mp
 
 from ..db import get_database
 from ..security.jwt import mint_jwt
 from ..security.deps import auth_user, auth_ist, auth_ai_proxy, auth_acet, auth_session_cookie
+from pydantic import ValidationError
+
 from ..schemas import (
+    ANSWER_TYPES,
+    AntiCheatEvent,
     CreateSessionRequest,
     CreateSessionResponse,
     PrecheckPayload,
@@ -33,6 +38,16 @@ from ..ai.proxy import generate_question, summarize_session, analyze_qa
 router = APIRouter(prefix="/interview", tags=["interview"])
 
 
+def _event_seq(raw: dict) -> int:
+    """Coerce a raw event's seq for ordering checks that run before the
+    per-event model validation; mirrors Pydantic's lax int coercion so a
+    string seq sorts instead of raising, and anything else is a 422."""
+    try:
+        return int(raw.get("seq", 0))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=422, detail="invalid_event")
+
+
 @router.post("/sessions", response_model=CreateSessionResponse)
 async def create_session(req: CreateSessionRequest, user=Depends(auth_user)):
     if not req.consentRecording or not req.consentAntiCheat:
@@ -73,7 +88,7 @@ async def submit_precheck(session_id: str, payload: PrecheckPayload, _=Depends(a
         raise HTTPException(status_code=409, detail="invalid_state")
 
     # Persist anti-cheat events append-only with chain verification
-    events = [e.model_dump() for e in (payload.events or [])]
+    events = payload.events or []
     if events:
         # Load current tail
         last = await db["anti_cheat_events"].find({"sessionId": session_id}).sort("seq", -1).limit(1).to_list(1)
@@ -81,13 +96,17 @@ async def submit_precheck(session_id: str, payload: PrecheckPayload, _=Depends(a
         last_hash = last[0].get("hash") if last else ""
 
         # Validate sequence strictly increasing
-        events_sorted = sorted(events, key=lambda x: x["seq"])
-        if events_sorted[0]["seq"] <= last_seq:
+        events_sorted = sorted(events, key=_event_seq)
+        if _event_seq(events_sorted[0]) <= last_seq:
             raise HTTPException(status_code=400, detail="event_seq_replay_or_out_of_order")
-        # Validate chain
+        # Validate chain, parsing each event lazily inside the loop
         prior_hash = last_hash
         enriched = []
-        for ev in events_sorted:
+        for raw in events_sorted:
+            try:
+                ev = AntiCheatEvent.model_validate(raw).model_dump()
+            except ValidationError:
+                raise HTTPException(status_code=422, detail="invalid_event")
             if ev.get("prevHash") != prior_hash:
                 raise HTTPException(status_code=400, detail="event_chain_broken")
             digest = hashlib.sha256()
@@ -217,18 +236,39 @@ async def next_question(session_id: str, claims=Depends(auth_ai_proxy)):
         {"type": "QUESTION_CREATED", "questionId": qid, "qtype": q.type, "number": asked + 1},
     )
 
-    return NextQuestionResponse(
+    # Already a typed model built in-handler; return a Response directly so
+    # FastAPI skips re-validating it against response_model
+    return JSONResponse(NextQuestionResponse(
         questionId=qid,
         questionNumber=asked + 1,
         totalQuestions=total,
         type=q.type,
         text=q.text,
         metadata=q.metadata,
-    )
+    ).model_dump(mode="json"))
 
 
 @router.post("/{session_id}/answer")
-async def submit_answer(session_id: str, req: SubmitAnswerRequest, _=Depends(auth_ist)):
+async def submit_answer(session_id: str, request: Request, _=Depends(auth_ist)):
+    # Hottest per-session endpoint: parse the body once and skip full
+    # Pydantic validation when the safety-critical fields check out.
+    # Anything unusual falls back to the real validator.
+    try:
+        data = json.loads(await request.body())
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HTTPException(status_code=422, detail="invalid_json")
+    if (
+        isinstance(data, dict)
+        and isinstance(data.get("sessionId"), str)
+        and isinstance(data.get("questionId"), str)
+        and data.get("answerType") in ANSWER_TYPES
+    ):
+        req = SubmitAnswerRequest.model_construct(**data)
+    else:
+        try:
+            req = SubmitAnswerRequest.model_validate(data)
+        except ValidationError:
+            raise HTTPException(status_code=422, detail="invalid_answer_payload")
     if db is None:
         raise HTTPException(status_code=500, detail="database_not_connected")
     sess = await db["sessions"].find_one({"_id": session_id})
@@ -257,7 +297,7 @@ async def submit_answer(session_id: str, req: SubmitAnswerRequest, _=Depends(aut
     except Exception:
         pass
 
-    return {"status": "submitted", "immediateFeedback": feedback}
+    return JSONResponse({"status": "submitted", "immediateFeedback": feedback})
 
 
 def _restricted_builtins():
@@ -589,20 +629,24 @@ async def anti_cheat_emit(session_id: str, payload: PrecheckPayload, _=Depends(a
         raise HTTPException(status_code=404, detail="session_not_found")
 
     # Chain verification and persistence (reuse logic similar to precheck)
-    events = [e.model_dump() for e in (payload.events or [])]
+    events = payload.events or []
     tail = await db["anti_cheat_events"].find({"sessionId": session_id}).sort("seq", -1).limit(1).to_list(1)
     last_seq = tail[0]["seq"] if tail else 0
     last_hash = tail[0].get("hash") if tail else ""
 
     if events:
-        events_sorted = sorted(events, key=lambda x: x["seq"])
-        if events_sorted[0]["seq"] <= last_seq:
+        events_sorted = sorted(events, key=_event_seq)
+        if _event_seq(events_sorted[0]) <= last_seq:
             raise HTTPException(status_code=400, detail="event_seq_replay_or_out_of_order")
 
         prior_hash = last_hash
         enriched = []
         strikes_to_insert = []
-        for ev in events_sorted:
+        for raw in events_sorted:
+            try:
+                ev = AntiCheatEvent.model_validate(raw).model_dump()
+            except ValidationError:
+                raise HTTPException(status_code=422, detail="invalid_event")
             if ev.get("prevHash") != prior_hash:
                 raise HTTPException(status_code=400, detail="event_chain_broken")
             digest = hashlib.sha256()
@@ -3,38 +3,82 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import base64
+import hmac
 import json
+import time
 import uuid
 import asyncio
 import logging
+import weakref
+
+from pymongo.errors import DuplicateKeyError
+from starlette.websockets import WebSocketState
 
 from ..main import limiter
 from ..config import settings
-from ..schemas import LiveInterviewSession, WebRTCCredentials
+from ..schemas import (
+    LiveInterviewSession, WebRTCCredentials,
+    ScheduleInterviewRequest, SessionStatusUpdate, SessionNotesRequest
+)
 from ..security.deps import get_current_user
-from ..security.jwt import mint_jwt, decode_jwt
+from ..security.jwt import AUD_WEBRTC, mint_jwt, decode_jwt
 from ..db import get_database
 
 router = APIRouter(prefix="/live-interview", tags=["live-interview"])
 logger = logging.getLogger(__name__)
 
+# Upper bound on inbound signaling frames; SDP offers are a few KB at most
+MAX_WS_FRAME_BYTES = 64 * 1024
+
+# Projection for routes that only need access control and scheduling fields;
+# session docs grow unbounded as chatMessages/sessionNotes/recordings accumulate
+_AUTHZ_PROJECTION = {"candidateId": 1, "recruiterId": 1, "status": 1, "scheduledTime": 1, "duration": 1}
+
+# Static STUN entry built once at import; TURN credentials are minted per join
+_STUN_SERVER = {"urls": "stun:stun.l.google.com:19302"}
+
+
+def _mint_turn_credential(user_id: str) -> Dict[str, str]:
+    """Mint a time-limited TURN credential (RFC 5766 REST API convention)"""
+    expiry = int(time.time()) + settings.ttl_wst
+    username = f"{expiry}:{user_id}"
+    digest = hmac.new(settings.turn_secret.encode(), username.encode(), "sha1").digest()
+    return {
+        "urls": "turn:turn.firstround.ai:3478",
+        "username": username,
+        "credential": base64.b64encode(digest).decode(),
+    }
+
 # WebSocket connection manager
 class ConnectionManager:
+    # How often the reaper sweeps for connections that missed cleanup
+    REAP_INTERVAL_SECONDS = 60
+
     def __init__(self):
-        self.active_connections: Dict[str, List[WebSocket]] = {}
+        # WeakSets so a connection whose cleanup path was skipped (crashed
+        # client, exception during disconnect) can still be garbage collected
+        self.active_connections: Dict[str, "weakref.WeakSet[WebSocket]"] = {}
         self.session_participants: Dict[str, Dict[str, str]] = {}
+        self._reaper_task: Optional[asyncio.Task] = None
 
     async def connect(self, websocket: WebSocket, session_id: str, user_id: str, user_role: str):
         await websocket.accept()
 
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_stale_connections())
+
+        # Compute the timestamp once per connection instead of per message dict
+        now_iso = datetime.utcnow().isoformat()
+
         if session_id not in self.active_connections:
-            self.active_connections[session_id] = []
+            self.active_connections[session_id] = weakref.WeakSet()
             self.session_participants[session_id] = {}
 
-        self.active_connections[session_id].append(websocket)
+        self.active_connections[session_id].add(websocket)
         self.session_participants[session_id][user_id] = {
             "role": user_role,
-            "connected_at": datetime.utcnow().isoformat(),
+            "connected_at": now_iso,
             "websocket_id": id(websocket)
         }
 
@@ -43,13 +87,12 @@ class ConnectionManager:
             "type": "participant_joined",
             "user_id": user_id,
             "role": user_role,
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now_iso
         }, exclude_websocket=websocket)
 
     def disconnect(self, websocket: WebSocket, session_id: str, user_id: str):
         if session_id in self.active_connections:
-            if websocket in self.active_connections[session_id]:
-                self.active_connections[session_id].remove(websocket)
+            self.active_connections[session_id].discard(websocket)
 
             if user_id in self.session_participants[session_id]:
                 del self.session_participants[session_id][user_id]
@@ -60,23 +103,27 @@ class ConnectionManager:
                 del self.session_participants[session_id]
 
     async def broadcast_to_session(self, session_id: str, message: Dict[str, Any], exclude_websocket: Optional[WebSocket] = None):
-        if session_id in self.active_connections:
-            disconnected = []
-            for connection in self.active_connections[session_id]:
-                if connection != exclude_websocket:
-                    try:
-                        await connection.send_text(json.dumps(message))
-                    except:
-                        disconnected.append(connection)
+        connections = self.active_connections.get(session_id)
+        if not connections:
+            return
 
-            # Remove disconnected connections
-            for conn in disconnected:
-                self.active_connections[session_id].remove(conn)
+        # Fast path: sole participant is the sender — nothing to serialize or send.
+        # Common before the second party joins a 1:1 session.
+        if exclude_websocket is not None and len(connections) == 1 and exclude_websocket in connections:
+            return
+
+        # Snapshot before awaiting — the WeakSet can shrink mid-iteration
+        for connection in list(connections):
+            if connection != exclude_websocket:
+                try:
+                    await connection.send_text(json.dumps(message))
+                except:
+                    connections.discard(connection)
 
     async def send_to_user(self, session_id: str, user_id: str, message: Dict[str, Any]):
         if session_id in self.session_participants and user_id in self.session_participants[session_id]:
             websocket_id = self.session_participants[session_id][user_id]["websocket_id"]
-            for connection in self.active_connections.get(session_id, []):
+            for connection in list(self.active_connections.get(session_id, ())):
                 if id(connection) == websocket_id:
                     try:
                         await connection.send_text(json.dumps(message))
@@ -85,13 +132,40 @@ class ConnectionManager:
                         # Connection is dead, will be cleaned up on next disconnect
                         pass
 
+    async def _reap_stale_connections(self):
+        """Periodically drop connections that disconnected without cleanup"""
+        while True:
+            await asyncio.sleep(self.REAP_INTERVAL_SECONDS)
+            for session_id in list(self.active_connections):
+                connections = self.active_connections[session_id]
+                for ws in list(connections):
+                    if ws.client_state != WebSocketState.CONNECTED:
+                        connections.discard(ws)
+
+                if not connections:
+                    self.active_connections.pop(session_id, None)
+                    self.session_participants.pop(session_id, None)
+                    continue
+
+                # Drop participant records whose socket is no longer tracked
+                live_ids = {id(ws) for ws in connections}
+                participants = self.session_participants.get(session_id, {})
+                for stale_user in [u for u, p in participants.items() if p["websocket_id"] not in live_ids]:
+                    del participants[stale_user]
+
 manager = ConnectionManager()
 
 
+def _log_background_write(task: asyncio.Task) -> None:
+    """Surface failures from fire-and-forget DB writes instead of swallowing them"""
+    if not task.cancelled() and task.exception():
+        logger.error(f"Background DB write failed: {task.exception()}")
+
+
 @router.post("/schedule", response_model=LiveInterviewSession)
 @limiter.limit("5/minute")
 async def schedule_interview(
-    request_data: Dict[str, Any],
+    request_data: ScheduleInterviewRequest,
     current_user: Dict = Depends(get_current_user)
 ):
     """Schedule a new live interview session"""
@@ -101,45 +175,35 @@ async def schedule_interview(
     if not settings.enable_live_interview:
         raise HTTPException(status_code=403, detail="Live interviews are not enabled")
 
-    # Validate required fields
-    required_fields = ["candidate_id", "scheduled_time", "duration"]
-    for field in required_fields:
-        if field not in request_data:
-            raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
-
     try:
-        scheduled_time = datetime.fromisoformat(request_data["scheduled_time"].replace('Z', '+00:00'))
+        scheduled_time = datetime.fromisoformat(request_data.scheduled_time.replace('Z', '+00:00'))
         if scheduled_time <= datetime.utcnow():
             raise HTTPException(status_code=400, detail="Scheduled time must be in the future")
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid scheduled_time format")
 
-    # Create interview session
+    # Create interview session; the meeting link is deterministic from the
+    # session id, so build the complete document and persist it in one write
     session_id = str(uuid.uuid4())
+    meeting_link = f"https://meet.firstround.ai/interview/{session_id}"
     session = LiveInterviewSession(
         sessionId=session_id,
-        candidateId=request_data["candidate_id"],
-        recruiterId=user_id if user_role != "candidate" else request_data.get("recruiter_id"),
-        scheduledTime=request_data["scheduled_time"],
-        duration=request_data["duration"],
+        candidateId=request_data.candidate_id,
+        recruiterId=user_id if user_role != "candidate" else request_data.recruiter_id,
+        scheduledTime=request_data.scheduled_time,
+        duration=request_data.duration,
         status="scheduled",
-        recordingEnabled=request_data.get("recording_enabled", True),
-        notes=request_data.get("notes", "")
+        meetingLink=meeting_link,
+        recordingEnabled=request_data.recording_enabled,
+        notes=request_data.notes
     )
 
     # Save to database
     db = get_database()
-    await db.live_interviews.insert_one(session.dict())
-
-    # Generate meeting link
-    meeting_link = f"https://meet.firstround.ai/interview/{session_id}"
-
-    # Update session with meeting link
-    await db.live_interviews.update_one(
-        {"sessionId": session_id},
-        {"$set": {"meetingLink": meeting_link}}
-    )
-    session.meetingLink = meeting_link
+    try:
+        await db.live_interviews.insert_one(session.model_dump())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="Session already exists")
 
     # TODO: Send calendar invitations and email notifications
 
@@ -205,7 +269,7 @@ async def join_interview_session(
 
     # Validate session
     db = get_database()
-    session = await db.live_interviews.find_one({"sessionId": session_id})
+    session = await db.live_interviews.find_one({"sessionId": session_id}, _AUTHZ_PROJECTION)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -239,15 +303,9 @@ async def join_interview_session(
         extra={"session_id": session_id, "user_role": user_role}
     )
 
-    # Configure ICE servers (in production, use actual TURN/STUN servers)
-    ice_servers = [
-        {"urls": "stun:stun.l.google.com:19302"},
-        {
-            "urls": "turn:turn.firstround.ai:3478",
-            "username": "firstround",
-            "credential": "turn-password"  # In production, use dynamic credentials
-        }
-    ]
+    # Configure ICE servers; TURN credential is HMAC-derived and expires
+    # with the WebRTC session token
+    ice_servers = [_STUN_SERVER, _mint_turn_credential(user_id)]
 
     credentials = WebRTCCredentials(
         sessionId=session_id,
@@ -263,18 +321,15 @@ async def join_interview_session(
 @limiter.limit("10/minute")
 async def update_session_status(
     session_id: str,
-    status_data: Dict[str, Any],
+    status_data: SessionStatusUpdate,
     current_user: Dict = Depends(get_current_user)
 ):
     """Update interview session status"""
     user_id = current_user["sub"]
-    new_status = status_data.get("status")
-
-    if new_status not in ["scheduled", "in_progress", "completed", "cancelled"]:
-        raise HTTPException(status_code=400, detail="Invalid status")
+    new_status = status_data.status
 
     db = get_database()
-    session = await db.live_interviews.find_one({"sessionId": session_id})
+    session = await db.live_interviews.find_one({"sessionId": session_id}, _AUTHZ_PROJECTION)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -311,18 +366,18 @@ async def update_session_status(
 @limiter.limit("20/minute")
 async def add_session_notes(
     session_id: str,
-    notes_data: Dict[str, Any],
+    notes_data: SessionNotesRequest,
     current_user: Dict = Depends(get_current_user)
 ):
     """Add notes to interview session"""
     user_id = current_user["sub"]
-    notes = notes_data.get("notes", "")
+    notes = notes_data.notes
 
     if not notes:
         raise HTTPException(status_code=400, detail="Notes cannot be empty")
 
     db = get_database()
-    session = await db.live_interviews.find_one({"sessionId": session_id})
+    session = await db.live_interviews.find_one({"sessionId": session_id}, _AUTHZ_PROJECTION)
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -361,7 +416,10 @@ async def get_session_notes(
     user_id = current_user["sub"]
 
     db = get_database()
-    session = await db.live_interviews.find_one({"sessionId": session_id})
+    session = await db.live_interviews.find_one(
+        {"sessionId": session_id},
+        {"candidateId": 1, "recruiterId": 1, "sessionNotes": 1}
+    )
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -379,7 +437,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, token: str):
     """WebSocket endpoint for live interview signaling"""
     try:
         # Verify token
-        claims = decode_jwt(token, audience="webrtc-service")
+        claims = await decode_jwt(token, audience=AUD_WEBRTC)
         user_id = claims["sub"]
         user_role = claims.get("role", "candidate")
 
@@ -410,7 +468,23 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, token: str):
         while True:
             try:
                 data = await websocket.receive_text()
-                message = json.loads(data)
+
+                # Reject oversized frames before parsing so a huge payload
+                # can't stall the event loop inside the JSON parser
+                if len(data) > MAX_WS_FRAME_BYTES:
+                    await websocket.close(code=1009, reason="Message too large")
+                    break
+
+                try:
+                    message = json.loads(data)
+                except json.JSONDecodeError:
+                    # Malformed input is a client error, not worth a stack trace
+                    await websocket.send_text(json.dumps({
+                        "type": "error",
+                        "message": "Invalid JSON",
+                        "timestamp": datetime.utcnow().isoformat()
+                    }))
+                    continue
 
                 # Process different message types
                 await handle_websocket_message(session_id, user_id, user_role, message)
@@ -443,91 +517,114 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str, token: str):
         })
 
 
-async def handle_websocket_message(session_id: str, user_id: str, user_role: str, message: Dict[str, Any]):
-    """Handle different types of WebSocket messages"""
-    message_type = message.get("type")
+async def _handle_ice_candidate(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    # Relay ICE candidates to other participants
+    await manager.broadcast_to_session(session_id, {
+        "type": "ice_candidate",
+        "candidate": message.get("candidate"),
+        "from_user": user_id,
+        "timestamp": now_iso
+    }, exclude_websocket=None)  # Send to all except sender (handled in broadcast function)
+
+
+async def _handle_offer(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    # Relay WebRTC offer to other participant
+    await manager.broadcast_to_session(session_id, {
+        "type": "offer",
+        "offer": message.get("offer"),
+        "from_user": user_id,
+        "timestamp": now_iso
+    })
+
+
+async def _handle_answer(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    # Relay WebRTC answer
+    await manager.broadcast_to_session(session_id, {
+        "type": "answer",
+        "answer": message.get("answer"),
+        "from_user": user_id,
+        "timestamp": now_iso
+    })
+
+
+async def _handle_chat(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    chat_message = {
+        "type": "chat",
+        "message": message.get("message", ""),
+        "from_user": user_id,
+        "role": user_role,
+        "timestamp": now_iso
+    }
 
-    if message_type == "ice_candidate":
-        # Relay ICE candidates to other participants
-        await manager.broadcast_to_session(session_id, {
-            "type": "ice_candidate",
-            "candidate": message.get("candidate"),
-            "from_user": user_id,
-            "timestamp": datetime.utcnow().isoformat()
-        }, exclude_websocket=None)  # Send to all except sender (handled in broadcast function)
+    # Broadcast to all participants first; persist concurrently so the
+    # DB round trip stays off the signaling critical path
+    await manager.broadcast_to_session(session_id, chat_message)
 
-    elif message_type == "offer":
-        # Relay WebRTC offer to other participant
-        await manager.broadcast_to_session(session_id, {
-            "type": "offer",
-            "offer": message.get("offer"),
-            "from_user": user_id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+    db = get_database()
+    task = asyncio.create_task(db.live_interviews.update_one(
+        {"sessionId": session_id},
+        {"$push": {"chatMessages": chat_message}}
+    ))
+    task.add_done_callback(_log_background_write)
 
-    elif message_type == "answer":
-        # Relay WebRTC answer
-        await manager.broadcast_to_session(session_id, {
-            "type": "answer",
-            "answer": message.get("answer"),
-            "from_user": user_id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
 
-    elif message_type == "chat":
-        # Handle chat messages
-        chat_message = {
-            "type": "chat",
-            "message": message.get("message", ""),
-            "from_user": user_id,
-            "role": user_role,
-            "timestamp": datetime.utcnow().isoformat()
-        }
+async def _handle_screen_share(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    await manager.broadcast_to_session(session_id, {
+        "type": "screen_share",
+        "sharing": message.get("sharing", False),
+        "from_user": user_id,
+        "timestamp": now_iso
+    })
 
-        # Save to database
-        db = get_database()
-        await db.live_interviews.update_one(
-            {"sessionId": session_id},
-            {"$push": {"chatMessages": chat_message}}
-        )
 
-        # Broadcast to all participants
-        await manager.broadcast_to_session(session_id, chat_message)
+async def _handle_recording(session_id: str, user_id: str, user_role: str, message: Dict[str, Any], now_iso: str):
+    recording_state = message.get("recording", False)
 
-    elif message_type == "screen_share":
-        # Handle screen sharing events
-        await manager.broadcast_to_session(session_id, {
-            "type": "screen_share",
-            "sharing": message.get("sharing", False),
-            "from_user": user_id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+    # Update session recording state in the background
+    db = get_database()
+    task = asyncio.create_task(db.live_interviews.update_one(
+        {"sessionId": session_id},
+        {"$set": {"recordingActive": recording_state}}
+    ))
+    task.add_done_callback(_log_background_write)
 
-    elif message_type == "recording":
-        # Handle recording events
-        recording_state = message.get("recording", False)
+    await manager.broadcast_to_session(session_id, {
+        "type": "recording",
+        "recording": recording_state,
+        "from_user": user_id,
+        "timestamp": now_iso
+    })
 
-        # Update session recording state
-        db = get_database()
-        await db.live_interviews.update_one(
-            {"sessionId": session_id},
-            {"$set": {"recordingActive": recording_state}}
-        )
 
-        await manager.broadcast_to_session(session_id, {
-            "type": "recording",
-            "recording": recording_state,
-            "from_user": user_id,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+# Dispatch table keyed by message type; O(1) lookup instead of an if/elif chain
+_MESSAGE_HANDLERS = {
+    "ice_candidate": _handle_ice_candidate,
+    "offer": _handle_offer,
+    "answer": _handle_answer,
+    "chat": _handle_chat,
+    "screen_share": _handle_screen_share,
+    "recording": _handle_recording,
+}
 
-    else:
+
+async def handle_websocket_message(session_id: str, user_id: str, user_role: str, message: Dict[str, Any]):
+    """Handle different types of WebSocket messages"""
+    message_type = message.get("type")
+
+    # One timestamp per inbound message; reused for relays and DB persistence
+    now_iso = datetime.utcnow().isoformat()
+
+    handler = _MESSAGE_HANDLERS.get(message_type)
+    if handler is None:
         # Unknown message type
         await manager.send_to_user(session_id, user_id, {
             "type": "error",
             "message": f"Unknown message type: {message_type}",
-            "timestamp": datetime.utcnow().isoformat()
+            "timestamp": now_iso
         })
+        return
+
+    await handler(session_id, user_id, user_role, message, now_iso)
 
 
 @router.get("/recordings/{session_id}")
@@ -540,7 +637,10 @@ async def get_session_recordings(
     user_id = current_user["sub"]
 
     db = get_database()
-    session = await db.live_interviews.find_one({"sessionId": session_id})
+    session = await db.live_interviews.find_one(
+        {"sessionId": session_id},
+        {"candidateId": 1, "recruiterId": 1, "recordings": 1, "recordingEnabled": 1, "recordingActive": 1}
+    )
 
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
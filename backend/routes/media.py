@@ -4,7 +4,7 @@ import hashlib
 import os
 
 from ..security.deps import auth_session_cookie
-from ..security.jwt import mint_jwt
+from ..security.jwt import AUD_UPLOAD, mint_jwt, decode_jwt, require_scope
 from ..config import settings
 from ..utils.ids import new_id
 
@@ -28,16 +28,17 @@ async def issue_upt(sessionId: str, _=Depends(auth_session_cookie)):
 @router.post("/upload")
 async def upload_media(token: str, file: UploadFile = File(...)):
     # Validate token
-    from ..security.jwt import decode_jwt, require_scope
-
-    claims = decode_jwt(token, audience="upload")
+    claims = await decode_jwt(token, audience=AUD_UPLOAD)
     session_id = claims.get("sessionId")
     require_scope(claims, f"upload:session:{session_id}")
 
-    data = await file.read()
-    checksum = hashlib.sha256(data).hexdigest()
+    # Stream to disk in chunks instead of buffering the whole file in memory,
+    # hashing incrementally as we go
     os.makedirs(".uploads", exist_ok=True)
     fname = f".uploads/{session_id}_{new_id()}_{file.filename}"
+    hasher = hashlib.sha256()
     with open(fname, "wb") as f:
-        f.write(data)
-    return JSONResponse({"url": fname, "checksum": checksum})
+        while chunk := await file.read(1024 * 1024):
+            hasher.update(chunk)
+            f.write(chunk)
+    return JSONResponse({"url": fname, "checksum": hasher.hexdigest()})
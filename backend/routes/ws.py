@@ -1,7 +1,7 @@
 from typing import Optional
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, HTTPException
 
-from ..security.jwt import decode_jwt, require_scope
+from ..security.jwt import AUD_INTERVIEW_WS, decode_jwt, require_scope
 from ..utils.broadcast import broker
 
 
@@ -14,7 +14,7 @@ async def ws_stream(websocket: WebSocket, session_id: str, token: Optional[str]
         await websocket.close(code=4401)
         return
     try:
-        claims = decode_jwt(token, audience="interview-ws")
+        claims = await decode_jwt(token, audience=AUD_INTERVIEW_WS)
         require_scope(claims, f"ws:interview:{session_id}")
     except HTTPException:
         await websocket.close(code=4403)
@@ -1,8 +1,10 @@
-from typing import List, Optional, Any, Literal
-from pydantic import BaseModel, Field
+from typing import List, Optional, Any, Dict, Literal, get_args
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class LoginRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     email: str
     name: Optional[str] = None
 
@@ -15,6 +17,8 @@ class UserJWT(BaseModel):
 
 
 class CreateSessionRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     userId: Optional[str] = None
     roleCategory: str
     roleSubType: Optional[str] = None
@@ -28,7 +32,7 @@ class CreateSessionRequest(BaseModel):
     difficulty: Literal["easy", "medium", "hard", "adaptive"]
     jobDescription: Optional[str] = None
     resumeFileRef: Optional[str] = None
-    companyTargets: List[str] = []
+    companyTargets: List[str] = Field(default_factory=list)
     includeCuratedQuestions: bool = True
     allowAIGenerated: bool = True
     enableMCQ: Optional[bool] = None
@@ -38,6 +42,12 @@ class CreateSessionRequest(BaseModel):
     consentTimestamp: str
 
 
+# Literal vocabularies exported as frozensets for handlers that validate
+# these fields manually on fast paths; derived from the annotations so the
+# two can't drift apart
+DIFFICULTIES = frozenset(get_args(CreateSessionRequest.model_fields["difficulty"].annotation))
+
+
 class CreateSessionResponse(BaseModel):
     sessionId: str
     ist: str
@@ -45,6 +55,10 @@ class CreateSessionResponse(BaseModel):
 
 
 class AntiCheatEvent(BaseModel):
+    # These arrive in bulk inside PrecheckPayload.events; frozen lets
+    # pydantic-core skip setattr machinery on each instance
+    model_config = ConfigDict(frozen=True)
+
     sessionId: str
     seq: int
     type: str
@@ -56,7 +70,11 @@ class AntiCheatEvent(BaseModel):
 class PrecheckPayload(BaseModel):
     sessionId: str
     checks: dict
-    events: List[AntiCheatEvent] = []
+    # Kept as raw dicts on purpose: large batches (1000s of events) would
+    # otherwise be fully validated before the handler runs. The routes
+    # validate each event with AntiCheatEvent.model_validate inside the
+    # persistence loop so parsing overlaps with hashing/IO.
+    events: List[dict] = Field(default_factory=list, max_length=5000)
 
 
 class PrecheckResponse(BaseModel):
@@ -79,10 +97,12 @@ class NextQuestionResponse(BaseModel):
     totalQuestions: int
     type: str
     text: str
-    metadata: dict = {}
+    metadata: dict = Field(default_factory=dict)
 
 
 class SubmitAnswerRequest(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     sessionId: str
     questionId: str
     answerType: Literal["voice", "text", "code", "mcq", "fib"]
@@ -96,6 +116,9 @@ class SubmitAnswerRequest(BaseModel):
     codeTests: Optional[List[dict]] = None
 
 
+ANSWER_TYPES = frozenset(get_args(SubmitAnswerRequest.model_fields["answerType"].annotation))
+
+
 class SubmitAnswerResponse(BaseModel):
   status: Literal["submitted"]
   immediateFeedback: Optional[dict] = None
@@ -132,6 +155,23 @@ class TokenRefreshResponse(BaseModel):
 
 
 # Live Interview Schemas
+class ScheduleInterviewRequest(BaseModel):
+    candidate_id: str
+    scheduled_time: str
+    duration: int
+    recruiter_id: Optional[str] = None
+    recording_enabled: bool = True
+    notes: str = ""
+
+
+class SessionStatusUpdate(BaseModel):
+    status: Literal["scheduled", "in_progress", "completed", "cancelled"]
+
+
+class SessionNotesRequest(BaseModel):
+    notes: str
+
+
 class LiveInterviewSession(BaseModel):
     sessionId: str
     candidateId: str
@@ -144,6 +184,9 @@ class LiveInterviewSession(BaseModel):
     notes: Optional[str] = None
 
 
+SESSION_STATUSES = frozenset(get_args(LiveInterviewSession.model_fields["status"].annotation))
+
+
 class WebRTCCredentials(BaseModel):
     sessionId: str
     iceServers: List[Dict[str, Any]]
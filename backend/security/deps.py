@@ -2,35 +2,54 @@ from typing import Optional
 
 from fastapi import Depends, Header, HTTPException, Request, status
 
-from .jwt import decode_jwt, require_scope
+from .jwt import (
+    AUD_AI_PROXY,
+    AUD_ANTI_CHEAT,
+    AUD_INTERVIEW,
+    AUD_SESSION,
+    AUD_USER,
+    decode_jwt,
+    require_scope,
+)
 
 
 def get_bearer_token(authorization: Optional[str] = Header(default=None)) -> str:
-    if not authorization or not authorization.lower().startswith("bearer "):
+    # Lowercase only the 7-char prefix and slice the token out directly —
+    # a full .lower()/.split() copies the whole header, and JWTs can be >1KB
+    if authorization is None or len(authorization) < 8 or authorization[:7].lower() != "bearer ":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="missing_bearer")
-    return authorization.split(" ", 1)[1]
+    return authorization[7:]
 
 
-def auth_user(token: str = Depends(get_bearer_token)) -> dict:
-    return decode_jwt(token, audience="user-api")
+def make_auth(audience: str, scope_builder=None):
+    """Build an auth dependency bound to one audience.
 
+    All auth_* dependencies share the same shape — decode against an
+    audience, optionally enforce a scope derived from the claims — so one
+    closure keeps the call path identical across endpoints.
+    """
+    async def dep(request: Request, token: str = Depends(get_bearer_token)) -> dict:
+        # Routers can stack several auth_* deps on one request; stash the
+        # decoded claims on request.state so the token is decoded once.
+        cached = getattr(request.state, "_jwt_claims", None)
+        if cached is not None and cached[0] == (token, audience):
+            claims = cached[1]
+        else:
+            claims = await decode_jwt(token, audience=audience)
+            request.state._jwt_claims = ((token, audience), claims)
+        if scope_builder is not None:
+            require_scope(claims, scope_builder(claims))
+        return claims
+    return dep
 
-def auth_ist(token: str = Depends(get_bearer_token)) -> dict:
-    claims = decode_jwt(token, audience="interview-api")
-    require_scope(claims, f"interview:session:{claims.get('sessionId')}")
-    return claims
 
+auth_user = make_auth(AUD_USER)
+auth_ist = make_auth(AUD_INTERVIEW, lambda c: f"interview:session:{c.get('sessionId')}")
+auth_ai_proxy = make_auth(AUD_AI_PROXY, lambda c: "ai:ask")
+auth_acet = make_auth(AUD_ANTI_CHEAT, lambda c: f"anti-cheat:emit:{c.get('sessionId')}")
 
-def auth_ai_proxy(token: str = Depends(get_bearer_token)) -> dict:
-    claims = decode_jwt(token, audience="ai-proxy")
-    require_scope(claims, "ai:ask")
-    return claims
-
-
-def auth_acet(token: str = Depends(get_bearer_token)) -> dict:
-    claims = decode_jwt(token, audience="anti-cheat")
-    require_scope(claims, f"anti-cheat:emit:{claims.get('sessionId')}")
-    return claims
+# Name used by the live-interview and career routes for user-facing auth
+get_current_user = auth_user
 
 
 def get_session_cookie(request: Request) -> str:
@@ -40,5 +59,5 @@ def get_session_cookie(request: Request) -> str:
     return cookie
 
 
-def auth_session_cookie(token: str = Depends(get_session_cookie)) -> dict:
-    return decode_jwt(token, audience="session")
+async def auth_session_cookie(token: str = Depends(get_session_cookie)) -> dict:
+    return await decode_jwt(token, audience=AUD_SESSION)
@@ -1,34 +1,168 @@
+import functools
+import logging
+import sys
 import time
 import uuid
+import base64
 import hashlib
+import hmac
+import re
 import secrets
 import os
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
 import jwt
+from cachetools import TTLCache
 from fastapi import HTTPException, status
 import redis
+import redis.asyncio as aredis
 import json
 
 from ..config import settings
 
+logger = logging.getLogger(__name__)
 
-# In-memory token revocation list (in production, use Redis)
-_token_revocation_list: Set[str] = set()
-_device_fingerprints: Dict[str, Dict[str, Any]] = {}
+# The aud/role/type claim vocabulary is small and fixed; interning it makes
+# the dict compares in the hot decode path pointer-equality first. Call
+# sites pass these constants instead of string literals.
+AUD_USER = sys.intern("user-api")
+AUD_INTERVIEW = sys.intern("interview-api")
+AUD_AI_PROXY = sys.intern("ai-proxy")
+AUD_ANTI_CHEAT = sys.intern("anti-cheat")
+AUD_SESSION = sys.intern("session")
+AUD_UPLOAD = sys.intern("upload")
+AUD_INTERVIEW_WS = sys.intern("interview-ws")
+AUD_WEBRTC = sys.intern("webrtc-service")
+AUD_DEVICE = sys.intern("device-auth")
 
-# Redis client for production (fallback to memory if not available)
-try:
-    redis_client = redis.Redis(
+_TYPE_ACCESS = sys.intern("access")
+_INTERNED_CLAIMS = ("aud", "role", "type")
+
+
+# In-memory token revocation list (in production, use Redis). Revoked JTIs
+# only matter until their token's exp passes, so a TTL cache sized for the
+# outstanding-token population keeps memory bounded over long uptimes.
+_token_revocation_list: TTLCache = TTLCache(maxsize=200000, ttl=max(settings.ttl_refresh_token, 3600))
+_device_fingerprints: TTLCache = TTLCache(maxsize=100000, ttl=settings.ttl_device_fingerprint)
+
+# Short-TTL caches of decoded claims keyed by token digest, so repeat requests
+# with the same token skip HMAC verification and JSON parsing. TTL is kept
+# well under a minute so expiry/revocation latency stays bounded; exp and
+# revocation are still re-checked on every hit.
+_decoded_jwt_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+_decoded_refresh_cache: TTLCache = TTLCache(maxsize=1000, ttl=30)
+
+# Known-non-revoked JTIs; lets repeat requests skip the Redis round trip.
+# Short TTL bounds how long a fresh revocation can go unseen by this process.
+_nonrevoked_jti_cache: TTLCache = TTLCache(maxsize=50000, ttl=15)
+
+# HMAC templates precompute the inner/outer key pads once at import; each
+# sign/verify copies the template instead of re-deriving them from the secret
+_AUTH_HMAC = hmac.new(settings.auth_secret.encode(), digestmod=hashlib.sha256)
+_REFRESH_HMAC = hmac.new(settings.refresh_token_secret.encode(), digestmod=hashlib.sha256)
+
+# Base64url of '{"alg":"HS256","typ":"JWT"}' — identical for every token we mint
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b"=")
+
+
+def _sign(template: "hmac.HMAC", msg: bytes) -> bytes:
+    h = template.copy()
+    h.update(msg)
+    return h.digest()
+
+
+def _sign_payload_bytes(body_bytes: bytes, template: "hmac.HMAC") -> str:
+    body = base64.urlsafe_b64encode(body_bytes).rstrip(b"=")
+    signing_input = _JWT_HEADER_B64 + b"." + body
+    sig = base64.urlsafe_b64encode(_sign(template, signing_input)).rstrip(b"=")
+    return (signing_input + b"." + sig).decode()
+
+
+def _encode_hs256(payload: Dict[str, Any], template: "hmac.HMAC") -> str:
+    """Serialize and sign an HS256 token using the precomputed header and key"""
+    return _sign_payload_bytes(
+        json.dumps(payload, separators=(",", ":")).encode(), template
+    )
+
+
+# Matches strings that serialize to JSON verbatim (no escaping needed) —
+# gate for the f-string fast path in mint_jwt. fullmatch, not $-anchored
+# match: '$' would accept a trailing newline, which must take the escaping
+# json.dumps path.
+_JSON_PLAIN = re.compile(r'[A-Za-z0-9_.:@/ -]*').fullmatch
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _fast_decode(token: str, template: "hmac.HMAC") -> Optional[Dict[str, Any]]:
+    """Verify an HS256 token and parse its claims without PyJWT's layers.
+
+    All tokens this service mints are HS256, so the common path is a single
+    split, one HMAC, and one JSON parse. Returns None for any other
+    algorithm so the caller can fall back to PyJWT.
+    """
+    try:
+        header_b64, payload_b64, sig_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        if header.get("alg") != "HS256":
+            return None
+        signing_input = f"{header_b64}.{payload_b64}".encode()
+        expected = _sign(template, signing_input)
+        if not hmac.compare_digest(expected, _b64url_decode(sig_b64)):
+            raise jwt.InvalidSignatureError("Signature verification failed")
+        return json.loads(_b64url_decode(payload_b64))
+    except (ValueError, TypeError):
+        raise jwt.DecodeError("Not enough segments or invalid encoding")
+
+
+def _validate_claims(payload: Dict[str, Any], audience: Optional[str] = None,
+                     required: tuple = ("exp", "iat")) -> None:
+    """Manual claim validation matching what jwt.decode enforced before"""
+    for claim in required:
+        if claim not in payload:
+            raise jwt.MissingRequiredClaimError(claim)
+    if payload["exp"] <= time.time():
+        raise jwt.ExpiredSignatureError("Signature has expired")
+    if audience is not None:
+        aud = payload.get("aud")
+        if aud != audience and not (isinstance(aud, list) and audience in aud):
+            raise jwt.InvalidAudienceError("Audience doesn't match")
+
+# Redis client for production (fallback to memory if not available).
+# Connected lazily: the old import-time ping() added a network RTT — or a
+# multi-second timeout on misconfigured hosts — to every process start and
+# every test import before a single request ran.
+@functools.cache
+def get_redis() -> Optional["redis.Redis"]:
+    try:
+        client = redis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", 6379)),
+            db=0,
+            decode_responses=True
+        )
+        client.ping()  # Test connection
+        return client
+    except Exception:
+        return None
+
+
+# Async client used on the request path — is_token_revoked runs inside every
+# authenticated handler, and a sync exists() there would block the event loop
+# for one Redis RTT per request. Availability is probed once via get_redis().
+@functools.cache
+def get_async_redis() -> Optional["aredis.Redis"]:
+    if get_redis() is None:
+        return None
+    return aredis.Redis(
         host=os.getenv("REDIS_HOST", "localhost"),
         port=int(os.getenv("REDIS_PORT", 6379)),
         db=0,
         decode_responses=True
     )
-    redis_client.ping()  # Test connection
-except:
-    redis_client = None
 
 
 def mint_jwt(
@@ -43,6 +177,27 @@ def mint_jwt(
     ip_address: Optional[str] = None,
 ) -> str:
     now = int(time.time())
+    jti = secrets.token_urlsafe(16)  # already URL-safe, never needs escaping
+
+    # Most mints carry exactly the fixed claim set below. For that shape,
+    # serialize straight to JSON bytes with one f-string instead of building
+    # a dict and walking it in json.dumps. Only safe when every string field
+    # is plain ASCII that JSON-encodes verbatim; anything else (or any
+    # optional claim) takes the generic dict path.
+    if (
+        extra is None and session_id is None and device_id is None
+        and ip_address is None
+        and _JSON_PLAIN(sub) and _JSON_PLAIN(role) and _JSON_PLAIN(aud)
+        and all(map(_JSON_PLAIN, scopes))
+    ):
+        scope_json = '["' + '","'.join(scopes) + '"]' if scopes else "[]"
+        body = (
+            f'{{"sub":"{sub}","role":"{role}","scope":{scope_json},'
+            f'"aud":"{aud}","iat":{now},"exp":{now + ttl_seconds},'
+            f'"jti":"{jti}","type":"access"}}'
+        ).encode()
+        return _sign_payload_bytes(body, _AUTH_HMAC)
+
     payload: Dict[str, Any] = {
         "sub": sub,
         "role": role,
@@ -50,7 +205,7 @@ def mint_jwt(
         "aud": aud,
         "iat": now,
         "exp": now + ttl_seconds,
-        "jti": str(uuid.uuid4()),
+        "jti": jti,
         "type": "access",
     }
     if session_id:
@@ -58,11 +213,11 @@ def mint_jwt(
     if device_id:
         payload["deviceId"] = device_id
     if ip_address:
-        payload["ip"] = hashlib.sha256(ip_address.encode()).hexdigest()[:16]
+        payload["ip"] = hashlib.blake2b(ip_address.encode(), digest_size=8).hexdigest()
     if extra:
         payload.update(extra)
 
-    return jwt.encode(payload, settings.auth_secret, algorithm="HS256")
+    return _encode_hs256(payload, _AUTH_HMAC)
 
 
 def mint_refresh_token(
@@ -84,11 +239,11 @@ def mint_refresh_token(
         "familyId": family_id,
         "iat": now,
         "exp": now + ttl_seconds,
-        "jti": str(uuid.uuid4()),
+        "jti": secrets.token_urlsafe(16),
         "type": "refresh",
     }
 
-    token = jwt.encode(token_data, settings.refresh_token_secret, algorithm="HS256")
+    token = _encode_hs256(token_data, _REFRESH_HMAC)
 
     return {
         "token": token,
@@ -105,110 +260,169 @@ def mint_device_fingerprint_token(device_fingerprint: str, user_id: str) -> str:
         "deviceFingerprint": device_fingerprint,
         "iat": now,
         "exp": now + settings.ttl_device_fingerprint,
-        "jti": str(uuid.uuid4()),
+        "jti": secrets.token_urlsafe(16),
         "type": "device",
-        "aud": "device-auth",
+        "aud": AUD_DEVICE,
     }
 
-    return jwt.encode(payload, settings.auth_secret, algorithm="HS256")
-
-
-def decode_jwt(token: str, audience: Optional[str] = None, check_revocation: bool = True) -> Dict[str, Any]:
-    try:
-        options = {"require": ["exp", "iat", "aud"]} if audience else {"require": ["exp", "iat"]}
-        payload = jwt.decode(
-            token,
-            settings.auth_secret,
-            algorithms=["HS256"],
-            audience=audience,
-            options=options,
-        )
-
-        # Check token revocation
-        if check_revocation and payload.get("type") == "access":
-            jti = payload.get("jti")
-            if is_token_revoked(jti):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="token_revoked"
+    return _encode_hs256(payload, _AUTH_HMAC)
+
+
+async def decode_jwt(token: str, audience: Optional[str] = None, check_revocation: bool = True) -> Dict[str, Any]:
+    cache_key = (hashlib.sha256(token.encode()).digest()[:16], audience)
+    payload = _decoded_jwt_cache.get(cache_key)
+
+    if payload is None:
+        try:
+            payload = _fast_decode(token, _AUTH_HMAC)
+            if payload is not None:
+                required = ("exp", "iat", "aud") if audience else ("exp", "iat")
+                _validate_claims(payload, audience, required)
+            else:
+                options = {"require": ["exp", "iat", "aud"]} if audience else {"require": ["exp", "iat"]}
+                payload = jwt.decode(
+                    token,
+                    settings.auth_secret,
+                    algorithms=["HS256"],
+                    audience=audience,
+                    options=options,
                 )
-
-        return payload
-    except jwt.ExpiredSignatureError:
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="token_expired")
+        except jwt.InvalidTokenError:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_token")
+        # Scope checks are set-membership from here on; convert once per decode
+        if "scope" in payload:
+            payload["scope"] = frozenset(payload["scope"])
+        # Swap vocabulary claims for their interned instances once per decode
+        for claim in _INTERNED_CLAIMS:
+            value = payload.get(claim)
+            if type(value) is str:
+                payload[claim] = sys.intern(value)
+        _decoded_jwt_cache[cache_key] = payload
+    elif payload["exp"] <= time.time():
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="token_expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_token")
+
+    # Revocation is checked on every call, cached or not
+    if check_revocation and payload.get("type") == _TYPE_ACCESS:
+        jti = payload.get("jti")
+        if await is_token_revoked(jti):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="token_revoked"
+            )
+
+    return payload
 
 
 def decode_refresh_token(token: str) -> Dict[str, Any]:
     """Decode a refresh token using the refresh token secret"""
+    cache_key = hashlib.sha256(token.encode()).digest()[:16]
+    payload = _decoded_refresh_cache.get(cache_key)
+    if payload is not None:
+        if payload["exp"] <= time.time():
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="refresh_token_expired")
+        return payload
+
     try:
-        return jwt.decode(
-            token,
-            settings.refresh_token_secret,
-            algorithms=["HS256"],
-            options={"require": ["exp", "iat", "type"]},
-        )
+        payload = _fast_decode(token, _REFRESH_HMAC)
+        if payload is not None:
+            _validate_claims(payload, required=("exp", "iat", "type"))
+        else:
+            payload = jwt.decode(
+                token,
+                settings.refresh_token_secret,
+                algorithms=["HS256"],
+                options={"require": ["exp", "iat", "type"]},
+            )
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="refresh_token_expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="invalid_refresh_token")
 
-
-def revoke_token(jti: str, reason: Optional[str] = None) -> None:
-    """Revoke a token by its JTI"""
-    if redis_client:
-        # Store in Redis with TTL based on token type
-        redis_client.setex(f"revoked:{jti}", 3600, json.dumps({
-            "revoked_at": int(time.time()),
-            "reason": reason or "manual_revocation"
-        }))
+    _decoded_refresh_cache[cache_key] = payload
+    return payload
+
+
+def revoke_token(jti: str, reason: Optional[str] = None, exp: Optional[int] = None) -> None:
+    """Revoke a token by its JTI.
+
+    Pass the token's ``exp`` when known so the Redis key expires with the
+    token instead of lingering for a fixed hour. The stored value is a bare
+    "1" — existence is all is_token_revoked checks — so there is no JSON to
+    encode on the hot path; the reason only goes to the audit log.
+    """
+    _nonrevoked_jti_cache.pop(jti, None)
+    client = get_redis()
+    if client:
+        ttl = max(60, exp - int(time.time())) if exp else 3600
+        client.setex(f"r:{jti}", ttl, "1")
+        if reason:
+            logger.info(f"Token revoked jti={jti} reason={reason}")
     else:
-        _token_revocation_list.add(jti)
+        _token_revocation_list[jti] = time.time()
 
 
 def revoke_token_family(family_id: str, except_device: Optional[str] = None) -> None:
     """Revoke all tokens in a family except for a specific device"""
-    if redis_client:
-        # Get all tokens in the family
+    client = get_redis()
+    if client:
+        # SCAN instead of KEYS — KEYS is O(N) over the whole keyspace and
+        # blocks the Redis server
         pattern = f"token_family:{family_id}:*"
-        keys = redis_client.keys(pattern)
-
-        for key in keys:
-            device_id = key.split(":")[-1]
-            if device_id != except_device:
-                token_data = redis_client.get(key)
-                if token_data:
-                    data = json.loads(token_data)
-                    revoke_token(data["jti"], "family_revocation")
-                    redis_client.delete(key)
+        targets = [
+            key for key in client.scan_iter(match=pattern, count=500)
+            if key.split(":")[-1] != except_device
+        ]
+        if not targets:
+            return
+
+        # Batch the reads, then the revocations + deletes, one RTT each
+        pipe = client.pipeline(transaction=False)
+        for key in targets:
+            pipe.get(key)
+        values = pipe.execute()
+
+        pipe = client.pipeline(transaction=False)
+        for key, token_data in zip(targets, values):
+            if token_data:
+                data = json.loads(token_data)
+                jti = data["jti"]
+                _nonrevoked_jti_cache.pop(jti, None)
+                ttl = max(60, data["exp"] - int(time.time())) if data.get("exp") else 3600
+                pipe.setex(f"r:{jti}", ttl, "1")
+            pipe.delete(key)
+        pipe.execute()
     else:
         # Fallback to memory storage (simplified)
         pass
 
 
-def is_token_revoked(jti: str) -> bool:
+async def is_token_revoked(jti: str) -> bool:
     """Check if a token is revoked"""
-    if redis_client:
-        return redis_client.exists(f"revoked:{jti}") > 0
+    if jti in _nonrevoked_jti_cache:
+        return False
+
+    client = get_async_redis()
+    if client:
+        revoked = await client.exists(f"r:{jti}") > 0
     else:
-        return jti in _token_revocation_list
+        revoked = jti in _token_revocation_list
+
+    if not revoked:
+        _nonrevoked_jti_cache[jti] = True
+    return revoked
 
 
 def require_scope(claims: Dict[str, Any], required: str) -> None:
-    scopes: List[str] = claims.get("scope", [])
-    if required in scopes:
-        return
-    # Support prefix matching for session-bound scopes
-    if any(s == required for s in scopes):
-        return
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="insufficient_scope")
+    if required not in claims.get("scope", ()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="insufficient_scope")
 
 
 def generate_device_fingerprint(user_agent: str, ip_address: str, accept_language: str) -> str:
     """Generate a device fingerprint from browser characteristics"""
     fingerprint_data = f"{user_agent}:{ip_address}:{accept_language}"
-    return hashlib.sha256(fingerprint_data.encode()).hexdigest()
+    return hashlib.blake2b(fingerprint_data.encode(), digest_size=16).hexdigest()
 
 
 def validate_device_binding(claims: Dict[str, Any], current_fingerprint: str) -> bool:
@@ -225,7 +439,7 @@ def validate_ip_binding(claims: Dict[str, Any], current_ip: str) -> bool:
     if not stored_ip_hash:
         return True  # No IP binding
 
-    current_ip_hash = hashlib.sha256(current_ip.encode()).hexdigest()[:16]
+    current_ip_hash = hashlib.blake2b(current_ip.encode(), digest_size=8).hexdigest()
     return stored_ip_hash == current_ip_hash
 
 
@@ -235,7 +449,7 @@ def rotate_refresh_token(old_token: str, new_device_fingerprint: Optional[str] =
         old_payload = decode_refresh_token(old_token)
 
         # Revoke old token
-        revoke_token(old_payload["jti"], "token_rotation")
+        revoke_token(old_payload["jti"], "token_rotation", exp=old_payload.get("exp"))
 
         # Mint new refresh token
         new_refresh = mint_refresh_token(
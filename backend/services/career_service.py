@@ -1,80 +1,242 @@
+import asyncio
+import hashlib
+import logging
 import uuid
 import json
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import re
 
+from dataclasses import asdict, dataclass
+from graphlib import TopologicalSorter
+
+from cachetools import TTLCache
+from pymongo import UpdateOne
+
+from ..config import settings
 from ..db import get_database
 from ..ai.proxy import AIProxy
 from ..schemas import CareerPath, SkillAssessment
 
+logger = logging.getLogger(__name__)
+
+
+# Career paths, skills, and market data. Built once at import — routes
+# construct a CareerService per request, and rebuilding this literal each
+# time allocated hundreds of strings and nested containers for no reason.
+_CAREER_DB: Dict[str, Any] = {
+    "career_paths": {
+        "software_engineer": {
+            "required_skills": [
+                "programming", "data_structures", "algorithms",
+                "system_design", "databases", "version_control",
+                "testing", "debugging", "communication"
+            ],
+            "average_salary": {"entry": 75000, "mid": 120000, "senior": 180000},
+            "growth_rate": 0.15,
+            "common_next_roles": ["senior_engineer", "tech_lead", "engineering_manager"]
+        },
+        "qa_engineer": {
+            "required_skills": [
+                "testing_methodologies", "automation", "manual_testing",
+                "api_testing", "performance_testing", "security_testing",
+                "bug_tracking", "documentation", "communication"
+            ],
+            "average_salary": {"entry": 65000, "mid": 95000, "senior": 130000},
+            "growth_rate": 0.12,
+            "common_next_roles": ["senior_qa", "qa_lead", "test_manager"]
+        },
+        "product_manager": {
+            "required_skills": [
+                "product_strategy", "market_research", "user_research",
+                "data_analysis", "communication", "stakeholder_management",
+                "agile_methodologies", "roadmap_planning", "prioritization"
+            ],
+            "average_salary": {"entry": 85000, "mid": 130000, "senior": 180000},
+            "growth_rate": 0.18,
+            "common_next_roles": ["senior_pm", "group_pm", "vp_product"]
+        }
+    },
+    "skills_database": {
+        "programming": {
+            "categories": ["technical", "core"],
+            "difficulty": "intermediate",
+            "learning_resources": [
+                {"title": "Python for Everyone", "type": "course", "duration": "6 weeks"},
+                {"title": "LeetCode Practice", "type": "practice", "duration": "ongoing"},
+                {"title": "System Design Primer", "type": "book", "duration": "4 weeks"}
+            ]
+        },
+        "communication": {
+            "categories": ["soft", "essential"],
+            "difficulty": "beginner",
+            "learning_resources": [
+                {"title": "Crucial Conversations", "type": "book", "duration": "2 weeks"},
+                {"title": "Public Speaking Practice", "type": "practice", "duration": "ongoing"},
+                {"title": "Technical Writing Course", "type": "course", "duration": "4 weeks"}
+            ]
+        }
+    },
+    "market_trends": {
+        "hot_skills": ["cloud_computing", "ai_ml", "cybersecurity", "blockchain"],
+        "declining_skills": ["legacy_systems", "manual_testing_only"],
+        "emerging_roles": ["ml_engineer", "devops_engineer", "sre"]
+    }
+}
+
+# Skill vocabularies checked per skill in the assessment loop; frozensets
+# make each membership test a hash lookup instead of a list scan
+_TECHNICAL_SKILLS = frozenset((
+    "programming", "data_structures", "algorithms", "system_design",
+    "databases", "testing", "debugging", "cloud_computing",
+))
+_SOFT_SKILLS = frozenset((
+    "communication", "leadership", "teamwork", "problem_solving",
+    "time_management", "adaptability", "creativity",
+))
+_CRITICAL_SKILLS = frozenset(("programming", "communication", "problem_solving"))
+_HIGH_PRIORITY_SKILLS = frozenset(("programming", "communication"))
+
+# Market insights change on the hour at best (and will eventually come from
+# external APIs); cache the assembled response per role instead of
+# recomputing trends and forecasts on every request
+_market_insights_cache: TTLCache = TTLCache(maxsize=32, ttl=3600)
+
+# AI responses keyed by prompt digest. Many users share identical
+# (skill, level, target) tuples, so identical prompts recur often and each
+# hit saves a full LLM round trip.
+_ai_response_cache: TTLCache = TTLCache(maxsize=2048, ttl=settings.ai_cache_ttl)
+
+# Strips "1. " / "- " / "* " style prefixes from AI suggestion lines;
+# compiled once so the hot parse path doesn't rebuild it
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s*")
+
+# Default learning order used when laying out milestones
+_SKILLS_SEQUENCE = ("programming", "system_design", "databases", "testing", "communication")
+
+# Prerequisite edges between skills (skill -> skills it builds on). Gaps are
+# ordered along this DAG so milestones always teach prerequisites first;
+# skills in the same topological layer have no dependency between each other
+# and can be learned in parallel.
+_SKILL_DAG: Dict[str, List[str]] = {
+    "programming": [],
+    "version_control": [],
+    "communication": [],
+    "data_structures": ["programming"],
+    "algorithms": ["programming", "data_structures"],
+    "databases": ["programming"],
+    "testing": ["programming"],
+    "debugging": ["programming"],
+    "system_design": ["data_structures", "databases"],
+}
+
+
+def _compute_skill_layers() -> List[List[str]]:
+    ts = TopologicalSorter(_SKILL_DAG)
+    ts.prepare()
+    layers = []
+    while ts.is_active():
+        ready = sorted(ts.get_ready())
+        layers.append(ready)
+        ts.done(*ready)
+    return layers
+
+
+_SKILL_LAYERS = _compute_skill_layers()
+_SKILL_LAYER_OF = {s: i for i, layer in enumerate(_SKILL_LAYERS) for s in layer}
+_DAG_ORDER = [s for layer in _SKILL_LAYERS for s in layer]
+
+# Shared empty-dict sentinel for .get() chains on the hot lookup paths
+_EMPTY: Dict[str, Any] = {}
+
+def _compute_avg_salaries() -> Dict[str, float]:
+    totals: Dict[str, List[float]] = {}
+    for role_data in _CAREER_DB["career_paths"].values():
+        for level, salary in role_data["average_salary"].items():
+            totals.setdefault(level, []).append(salary)
+    return {level: sum(vals) / len(vals) for level, vals in totals.items()}
+
+
+# Cross-role salary averages; _CAREER_DB is static, so aggregate once at
+# import instead of per _get_salary_insights(None) call
+_AVG_SALARIES = _compute_avg_salaries()
+
+
+@dataclass(slots=True)
+class Milestone:
+    """One step of a generated career plan.
+
+    Slotted so the six-instance list built per plan stores fixed attribute
+    slots instead of a per-object dict; asdict() converts at the CareerPath
+    boundary, which still expects plain dicts.
+    """
+    id: str
+    title: str
+    targetMonth: int
+    skills: List[str]
+    parallelGroup: Optional[int]
+    deliverables: List[str]
+    successCriteria: str
+    estimatedHours: int
+    completed: bool = False
+
+
+# Prompt templates, parsed once at import; the methods fill them with a
+# single format_map call instead of re-assembling multi-line f-strings
+_CAREER_PROMPT = """
+Generate a personalized career development plan for:
+- Target Role: {target_role}
+- Current Skills: {current_skills}
+- Experience Level: {experience_level}
+- Skill Gaps: {skill_gaps}
+- Timeline Preference: {timeline_preference} months
+
+Provide:
+1. Prioritized learning sequence
+2. Specific milestones with timelines
+3. Recommended resources for each skill
+4. Progress metrics and checkpoints
+"""
+
+_SUGGESTION_PROMPT = """
+Provide specific, actionable improvement suggestions for:
+- Skill: {skill_name}
+- Current Level: {current_level}/10
+- Target Level: {target_level}/10
+- Recent Performance: {average_score:.1f} average score
+- Trend: {improvement_trend:.2f} (positive = improving)
+
+Provide 3-4 specific suggestions that are:
+1. Actionable and measurable
+2. Appropriate for the current level
+3. Focused on reaching the target level
+4. Based on the performance trend
+"""
+
+
+# Fallback suggestions when the AI call fails, as format templates
+_FALLBACK_SUGGESTIONS = (
+    "Practice {s} exercises daily",
+    "Seek feedback on {s} from peers",
+    "Study advanced {s} concepts",
+    "Apply {s} in real-world projects",
+)
+
 
 class CareerService:
     def __init__(self):
         self.ai_proxy = AIProxy()
-        self.career_data = self._load_career_database()
-
-    def _load_career_database(self) -> Dict[str, Any]:
-        """Load career paths, skills, and market data"""
-        return {
-            "career_paths": {
-                "software_engineer": {
-                    "required_skills": [
-                        "programming", "data_structures", "algorithms",
-                        "system_design", "databases", "version_control",
-                        "testing", "debugging", "communication"
-                    ],
-                    "average_salary": {"entry": 75000, "mid": 120000, "senior": 180000},
-                    "growth_rate": 0.15,
-                    "common_next_roles": ["senior_engineer", "tech_lead", "engineering_manager"]
-                },
-                "qa_engineer": {
-                    "required_skills": [
-                        "testing_methodologies", "automation", "manual_testing",
-                        "api_testing", "performance_testing", "security_testing",
-                        "bug_tracking", "documentation", "communication"
-                    ],
-                    "average_salary": {"entry": 65000, "mid": 95000, "senior": 130000},
-                    "growth_rate": 0.12,
-                    "common_next_roles": ["senior_qa", "qa_lead", "test_manager"]
-                },
-                "product_manager": {
-                    "required_skills": [
-                        "product_strategy", "market_research", "user_research",
-                        "data_analysis", "communication", "stakeholder_management",
-                        "agile_methodologies", "roadmap_planning", "prioritization"
-                    ],
-                    "average_salary": {"entry": 85000, "mid": 130000, "senior": 180000},
-                    "growth_rate": 0.18,
-                    "common_next_roles": ["senior_pm", "group_pm", "vp_product"]
-                }
-            },
-            "skills_database": {
-                "programming": {
-                    "categories": ["technical", "core"],
-                    "difficulty": "intermediate",
-                    "learning_resources": [
-                        {"title": "Python for Everyone", "type": "course", "duration": "6 weeks"},
-                        {"title": "LeetCode Practice", "type": "practice", "duration": "ongoing"},
-                        {"title": "System Design Primer", "type": "book", "duration": "4 weeks"}
-                    ]
-                },
-                "communication": {
-                    "categories": ["soft", "essential"],
-                    "difficulty": "beginner",
-                    "learning_resources": [
-                        {"title": "Crucial Conversations", "type": "book", "duration": "2 weeks"},
-                        {"title": "Public Speaking Practice", "type": "practice", "duration": "ongoing"},
-                        {"title": "Technical Writing Course", "type": "course", "duration": "4 weeks"}
-                    ]
-                }
-            },
-            "market_trends": {
-                "hot_skills": ["cloud_computing", "ai_ml", "cybersecurity", "blockchain"],
-                "declining_skills": ["legacy_systems", "manual_testing_only"],
-                "emerging_roles": ["ml_engineer", "devops_engineer", "sre"]
-            }
-        }
+        self.career_data = _CAREER_DB
+
+    async def _cached_ai(self, prompt: str, method) -> str:
+        """Run an AI call through the prompt-keyed response cache"""
+        key = hashlib.sha1(prompt.encode()).hexdigest()
+        hit = _ai_response_cache.get(key)
+        if hit is not None:
+            return hit
+        response = await method(prompt)
+        _ai_response_cache[key] = response
+        return response
 
     async def generate_career_path(
         self,
@@ -90,30 +252,31 @@ class CareerService:
         role_data = self.career_data["career_paths"].get(target_role, {})
         required_skills = role_data.get("required_skills", [])
 
-        # Identify skill gaps
-        skill_gaps = [skill for skill in required_skills if skill not in current_skills]
+        # Identify skill gaps; one set build keeps the diff O(R+C) while
+        # preserving the required-skill ordering
+        current_set = set(current_skills)
+        skill_gaps = [skill for skill in required_skills if skill not in current_set]
+
+        # Order the gaps along the prerequisite DAG; skills the DAG doesn't
+        # know keep their required-skills order at the end
+        gap_set = set(skill_gaps)
+        ordered_gaps = [s for s in _DAG_ORDER if s in gap_set]
+        ordered_gaps += [s for s in skill_gaps if s not in _SKILL_LAYER_OF]
 
         # Generate learning path using AI
-        ai_prompt = f"""
-        Generate a personalized career development plan for:
-        - Target Role: {target_role}
-        - Current Skills: {', '.join(current_skills)}
-        - Experience Level: {experience_level}
-        - Skill Gaps: {', '.join(skill_gaps)}
-        - Timeline Preference: {timeline_preference} months
-
-        Provide:
-        1. Prioritized learning sequence
-        2. Specific milestones with timelines
-        3. Recommended resources for each skill
-        4. Progress metrics and checkpoints
-        """
+        ai_prompt = _CAREER_PROMPT.format_map({
+            "target_role": target_role,
+            "current_skills": ", ".join(current_skills),
+            "experience_level": experience_level,
+            "skill_gaps": ", ".join(skill_gaps),
+            "timeline_preference": timeline_preference,
+        })
 
-        ai_response = await self.ai_proxy.generate_career_guidance(ai_prompt)
+        ai_response = await self._cached_ai(ai_prompt, self.ai_proxy.generate_career_guidance)
 
         # Parse AI response and create structured career path
-        milestones = self._parse_ai_milestones(ai_response, timeline_preference)
-        learning_resources = self._get_learning_resources_for_skills(skill_gaps)
+        milestones = self._parse_ai_milestones(ai_response, timeline_preference, ordered_gaps)
+        learning_resources = self._get_learning_resources_for_skills(ordered_gaps)
 
         career_path = CareerPath(
             userId=user_id,
@@ -123,63 +286,75 @@ class CareerService:
             skillGaps=skill_gaps,
             learningResources=learning_resources,
             timelineMonths=timeline_preference,
-            milestones=milestones,
+            milestones=[asdict(m) for m in milestones],
             createdAt=datetime.utcnow().isoformat()
         )
 
         # Save to database
         db = get_database()
-        await db.career_paths.insert_one(career_path.dict())
+        await db.career_paths.insert_one(career_path.model_dump())
 
         return career_path
 
-    def _parse_ai_milestones(self, ai_response: str, timeline_months: int) -> List[Dict[str, Any]]:
+    def _parse_ai_milestones(
+        self,
+        ai_response: str,
+        timeline_months: int,
+        skills_sequence: Optional[List[str]] = None,
+    ) -> List[Milestone]:
         """Parse AI response to create structured milestones"""
         # For demo, create sample milestones
         # In production, parse actual AI response
         milestones = []
+        sequence = skills_sequence or _SKILLS_SEQUENCE
 
         # Calculate milestone intervals
         num_milestones = min(6, timeline_months // 2)  # One milestone every 2 months
         interval = timeline_months / num_milestones
 
-        skills_sequence = ["programming", "system_design", "databases", "testing", "communication"]
-
         for i in range(num_milestones):
             month = int((i + 1) * interval)
-            skills_to_learn = skills_sequence[i:min(i+2, len(skills_sequence))]
-
-            milestone = {
-                "id": str(uuid.uuid4()),
-                "title": f"Milestone {i+1}: {', '.join(skills_to_learn).title()}",
-                "targetMonth": month,
-                "skills": skills_to_learn,
-                "deliverables": [
+            skills_to_learn = list(sequence[i:i + 2])
+            joined = ", ".join(skills_to_learn)
+            # Skills sharing a topological layer carry no prerequisite edge
+            # between them; surface the layer so clients can show them as
+            # learnable in parallel
+            layers = [_SKILL_LAYER_OF[s] for s in skills_to_learn if s in _SKILL_LAYER_OF]
+
+            milestones.append(Milestone(
+                id=str(uuid.uuid4()),
+                title=f"Milestone {i+1}: {joined.title()}",
+                targetMonth=month,
+                skills=skills_to_learn,
+                parallelGroup=min(layers) if layers else None,
+                deliverables=[
                     f"Complete {skill} course" for skill in skills_to_learn
                 ],
-                "successCriteria": f"Complete projects demonstrating proficiency in {', '.join(skills_to_learn)}",
-                "estimatedHours": 40 * len(skills_to_learn),
-                "completed": False
-            }
-            milestones.append(milestone)
+                successCriteria=f"Complete projects demonstrating proficiency in {joined}",
+                estimatedHours=40 * len(skills_to_learn),
+            ))
 
         return milestones
 
     def _get_learning_resources_for_skills(self, skills: List[str]) -> List[Dict[str, str]]:
         """Get learning resources for specific skills"""
         resources = []
+        append = resources.append
+        skills_db = self.career_data["skills_database"]
 
         for skill in skills:
-            skill_data = self.career_data["skills_database"].get(skill, {})
-            skill_resources = skill_data.get("learning_resources", [])
+            skill_resources = skills_db.get(skill, _EMPTY).get("learning_resources")
+            if not skill_resources:
+                continue
+            priority = "high" if skill in _HIGH_PRIORITY_SKILLS else "medium"
 
             for resource in skill_resources[:2]:  # Top 2 resources per skill
-                resources.append({
+                append({
                     "skill": skill,
                     "title": resource["title"],
                     "type": resource["type"],
                     "duration": resource["duration"],
-                    "priority": "high" if skill in ["programming", "communication"] else "medium"
+                    "priority": priority
                 })
 
         return resources
@@ -193,28 +368,49 @@ class CareerService:
 
         assessments = []
 
-        # Get user's recent interview performance
+        # Get user's recent interview performance, streaming the cursor
+        # straight into the aggregation instead of materializing documents
+        # first. Only feedback.rubric is read downstream; projecting it keeps
+        # the BSON transfer and decode small. Needs the
+        # {userId:1, createdAt:-1} compound index to stay an indexed sort.
         db = get_database()
-        recent_sessions = await db.sessions.find(
-            {"userId": user_id}
-        ).sort("createdAt", -1).limit(10).to_list(None)
+        cursor = db.sessions.find(
+            {"userId": user_id},
+            {"feedback.rubric": 1, "_id": 0},
+        ).sort("createdAt", -1).limit(10)
 
         # Analyze performance by skill category
-        skill_performance = self._analyze_performance_by_skill(recent_sessions)
+        skill_performance = await self._analyze_performance_by_skill(cursor)
 
+        # The career path doesn't change mid-assessment; fetch it once here
+        # rather than once per skill inside the loop
+        career_path = await db.career_paths.find_one(
+            {"userId": user_id}, {"requiredSkills": 1, "_id": 0}
+        )
+
+        meta = []
         for skill_name, performance_data in skill_performance.items():
             # Determine current level (1-10)
             current_level = min(10, max(1, int(performance_data["average_score"] / 10)))
 
             # Get target level based on career goals
-            target_level = await self._get_target_skill_level(user_id, skill_name)
+            target_level = self._compute_target_level(career_path, skill_name)
+            meta.append((skill_name, current_level, target_level, performance_data))
 
-            # Generate improvement suggestions using AI
-            suggestions = await self._generate_skill_improvement_suggestions(
+        # The AI suggestion calls are independent I/O; run them concurrently
+        # so total latency is the slowest call rather than the sum
+        all_suggestions = await asyncio.gather(*(
+            self._generate_skill_improvement_suggestions(
                 skill_name, current_level, target_level, performance_data
             )
-
-            assessment = SkillAssessment(
+            for skill_name, current_level, target_level, performance_data in meta
+        ))
+
+        now_iso = datetime.utcnow().isoformat()
+        for (skill_name, current_level, target_level, performance_data), suggestions in zip(
+            meta, all_suggestions
+        ):
+            assessments.append(SkillAssessment(
                 userId=user_id,
                 skillCategory=self._categorize_skill(skill_name),
                 skillName=skill_name,
@@ -222,84 +418,84 @@ class CareerService:
                 targetLevel=target_level,
                 assessmentScore=performance_data["average_score"],
                 improvementSuggestions=suggestions,
-                lastAssessed=datetime.utcnow().isoformat()
-            )
-
-            assessments.append(assessment)
-
-        # Save assessments to database
-        for assessment in assessments:
-            await db.skill_assessments.replace_one(
-                {"userId": user_id, "skillName": assessment.skillName},
-                assessment.dict(),
-                upsert=True
+                lastAssessed=now_iso
+            ))
+
+        # Save assessments in one round trip instead of one upsert per skill
+        if assessments:
+            await db.skill_assessments.bulk_write(
+                [
+                    UpdateOne(
+                        {"userId": user_id, "skillName": a.skillName},
+                        {"$set": a.model_dump()},
+                        upsert=True,
+                    )
+                    for a in assessments
+                ],
+                ordered=False,
             )
 
         return assessments
 
-    def _analyze_performance_by_skill(self, sessions: List[Dict]) -> Dict[str, Dict]:
-        """Analyze interview performance by skill category"""
+    async def _analyze_performance_by_skill(self, sessions) -> Dict[str, Dict]:
+        """Analyze interview performance by skill category.
+
+        Consumes an async iterable of session documents (typically a Motor
+        cursor) and folds running sums per skill, so neither the documents
+        nor per-skill score lists are ever held in memory at once. The
+        improvement trend is the closed-form least-squares slope over
+        x = 0..n-1, which only needs n, sum(y) and sum(x*y):
+            slope = (n*sum(x*y) - sum(x)*sum(y)) / (n^2 * (n^2 - 1) / 12)
+        """
         skill_performance = {}
 
-        for session in sessions:
-            feedback = session.get("feedback", {})
-            rubric = feedback.get("rubric", {})
+        async for session in sessions:
+            rubric = session.get("feedback", {}).get("rubric", {})
 
             for skill, score_data in rubric.items():
-                if skill not in skill_performance:
-                    skill_performance[skill] = {"scores": [], "count": 0}
-
-                if isinstance(score_data, dict) and "score" in score_data:
-                    skill_performance[skill]["scores"].append(score_data["score"])
+                entry = skill_performance.get(skill)
+                if entry is None:
+                    entry = skill_performance[skill] = {
+                        "n": 0, "sum_y": 0.0, "sum_xy": 0.0, "count": 0
+                    }
+
+                score = None
+                if isinstance(score_data, dict):
+                    if "score" in score_data:
+                        score = score_data["score"]
                 elif isinstance(score_data, (int, float)):
-                    skill_performance[skill]["scores"].append(score_data)
-
-                skill_performance[skill]["count"] += 1
-
-        # Calculate averages
-        for skill, data in skill_performance.items():
-            scores = data["scores"]
-            if scores:
-                data["average_score"] = sum(scores) / len(scores)
-                data["improvement_trend"] = self._calculate_trend(scores)
+                    score = score_data
+
+                if score is not None:
+                    entry["sum_xy"] += entry["n"] * score
+                    entry["sum_y"] += score
+                    entry["n"] += 1
+                entry["count"] += 1
+
+        # Finalize averages and trends from the running sums
+        for data in skill_performance.values():
+            n = data.pop("n")
+            sum_y = data.pop("sum_y")
+            sum_xy = data.pop("sum_xy")
+            if n:
+                data["average_score"] = sum_y / n
+                data["improvement_trend"] = 0 if n < 2 else (
+                    (n * sum_xy - (n * (n - 1) / 2) * sum_y)
+                    / (n * n * (n * n - 1) / 12)
+                )
             else:
                 data["average_score"] = 0
                 data["improvement_trend"] = 0
 
         return skill_performance
 
-    def _calculate_trend(self, scores: List[float]) -> float:
-        """Calculate improvement trend from scores"""
-        if len(scores) < 2:
-            return 0
-
-        # Simple linear regression to calculate trend
-        n = len(scores)
-        x_values = list(range(n))
-
-        x_mean = sum(x_values) / n
-        y_mean = sum(scores) / n
-
-        numerator = sum((x_values[i] - x_mean) * (scores[i] - y_mean) for i in range(n))
-        denominator = sum((x_values[i] - x_mean) ** 2 for i in range(n))
-
-        if denominator == 0:
-            return 0
-
-        return numerator / denominator
-
-    async def _get_target_skill_level(self, user_id: str, skill_name: str) -> int:
-        """Get target skill level based on user's career goals"""
-        # Get user's active career path
-        db = get_database()
-        career_path = await db.career_paths.find_one({"userId": user_id})
-
+    def _compute_target_level(self, career_path: Optional[Dict], skill_name: str) -> int:
+        """Get target skill level based on the user's pre-fetched career path"""
         if not career_path:
             return 7  # Default target level
 
         # Set target based on skill importance for target role
-        critical_skills = ["programming", "communication", "problem_solving"]
-        if skill_name in critical_skills:
+        if skill_name in _CRITICAL_SKILLS:
             return 9
         elif skill_name in career_path.get("requiredSkills", []):
             return 8
@@ -315,56 +511,45 @@ class CareerService:
     ) -> List[str]:
         """Generate AI-powered improvement suggestions"""
 
-        ai_prompt = f"""
-        Provide specific, actionable improvement suggestions for:
-        - Skill: {skill_name}
-        - Current Level: {current_level}/10
-        - Target Level: {target_level}/10
-        - Recent Performance: {performance_data.get('average_score', 0):.1f} average score
-        - Trend: {performance_data.get('improvement_trend', 0):.2f} (positive = improving)
-
-        Provide 3-4 specific suggestions that are:
-        1. Actionable and measurable
-        2. Appropriate for the current level
-        3. Focused on reaching the target level
-        4. Based on the performance trend
-        """
+        ai_prompt = _SUGGESTION_PROMPT.format_map({
+            "skill_name": skill_name,
+            "current_level": current_level,
+            "target_level": target_level,
+            "average_score": performance_data.get("average_score", 0),
+            "improvement_trend": performance_data.get("improvement_trend", 0),
+        })
 
         try:
-            ai_response = await self.ai_proxy.generate_feedback(ai_prompt)
-            # Parse AI response into list of suggestions
-            suggestions = [s.strip() for s in ai_response.split('\n') if s.strip()]
-            return suggestions[:4]  # Return top 4 suggestions
-        except:
-            # Fallback suggestions
+            ai_response = await self._cached_ai(ai_prompt, self.ai_proxy.generate_feedback)
+            # Parse AI response into suggestions, dropping bullet/number
+            # prefixes; splitlines also handles \r\n uniformly
             return [
-                f"Practice {skill_name} exercises daily",
-                f"Seek feedback on {skill_name} from peers",
-                f"Study advanced {skill_name} concepts",
-                f"Apply {skill_name} in real-world projects"
-            ]
+                _BULLET_RE.sub("", line).strip()
+                for line in ai_response.splitlines()
+                if line.strip()
+            ][:4]  # Return top 4 suggestions
+        except Exception as e:
+            # Bare except here used to swallow CancelledError too, masking
+            # task cancellation in the gather above
+            logger.warning(f"AI suggestion generation failed for {skill_name}: {e}")
+            return [t.format(s=skill_name) for t in _FALLBACK_SUGGESTIONS]
 
     def _categorize_skill(self, skill_name: str) -> str:
         """Categorize skill into technical, soft, or domain-specific"""
-        technical_skills = [
-            "programming", "data_structures", "algorithms", "system_design",
-            "databases", "testing", "debugging", "cloud_computing"
-        ]
-
-        soft_skills = [
-            "communication", "leadership", "teamwork", "problem_solving",
-            "time_management", "adaptability", "creativity"
-        ]
-
-        if skill_name in technical_skills:
+        if skill_name in _TECHNICAL_SKILLS:
             return "technical"
-        elif skill_name in soft_skills:
+        elif skill_name in _SOFT_SKILLS:
             return "soft"
         else:
             return "domain_specific"
 
     async def get_market_insights(self, role: Optional[str] = None) -> Dict[str, Any]:
         """Get market insights and trends for career planning"""
+        cache_key = role or "all"
+        cached = _market_insights_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         market_data = self.career_data["market_trends"]
 
         insights = {
@@ -375,6 +560,7 @@ class CareerService:
             "demand_forecast": await self._get_demand_forecast()
         }
 
+        _market_insights_cache[cache_key] = insights
         return insights
 
     async def _get_industry_trends(self) -> List[Dict[str, Any]]:
@@ -403,19 +589,8 @@ class CareerService:
         if role and role in self.career_data["career_paths"]:
             return self.career_data["career_paths"][role]["average_salary"]
 
-        # Return general market data
-        all_salaries = {}
-        for role_data in self.career_data["career_paths"].values():
-            for level, salary in role_data["average_salary"].items():
-                if level not in all_salaries:
-                    all_salaries[level] = []
-                all_salaries[level].append(salary)
-
-        # Calculate averages
-        return {
-            level: sum(salaries) / len(salaries)
-            for level, salaries in all_salaries.items()
-        }
+        # General market data, preaggregated at import
+        return _AVG_SALARIES
 
     async def _get_demand_forecast(self) -> Dict[str, Any]:
         """Get demand forecast for different skills and roles"""
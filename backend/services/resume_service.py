@@ -1,3 +1,8 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import os
 import uuid
 import re
 import json
@@ -7,95 +12,263 @@ import io
 import pdfplumber
 import docx
 from collections import Counter
+import logging
+from cachetools import TTLCache
 
+from ..config import settings
 from ..db import get_database
 from ..ai.proxy import AIProxy
 from ..schemas import ResumeUploadResponse, ResumeOptimization
 
+logger = logging.getLogger(__name__)
+
+# Write batching: during bulk-hiring bursts each upload paid one Mongo round
+# trip; queued documents are flushed together instead, up to this many per
+# insert_many and after at most this long waiting for more.
+_WRITE_BATCH_SIZE = 100
+_WRITE_BATCH_WINDOW = 0.05
+
+
+# Patterns compiled once at import; the parsers below run them per line over
+# resumes with hundreds of lines, so per-call re-parsing and cache probes
+# add up
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_PHONE_RE = re.compile(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}')
+_LINKEDIN_RE = re.compile(r'linkedin\.com/in/[A-Za-z0-9-]+')
+_GITHUB_RE = re.compile(r'github\.com/[A-Za-z0-9-]+')
+_DATE_RE = re.compile(r'\d{4}|\d{1,2}/\d{4}|present', re.IGNORECASE)
+# Normalizes ';' and '|' skill delimiters to ',' so one C-level str.split
+# handles dense skills lines instead of the regex engine
+_SKILL_TRANS = str.maketrans({';': ',', '|': ','})
+_DIGIT_RE = re.compile(r'\d+')
+# Experience-line separator: '|' with optional spacing, or '-' only when
+# surrounded by whitespace so intra-word hyphens (Co-founder) and date
+# ranges (2020-2023) stay intact
+_EXP_SEP_RE = re.compile(r'\s*\|\s*|\s+-\s+')
+
+# AI responses keyed by prompt digest. Re-uploads and re-optimizations of the
+# same resume repeat the exact prompt, and each hit saves a full LLM round
+# trip — by far the dominant latency in this service.
+_ai_response_cache: TTLCache = TTLCache(maxsize=2048, ttl=settings.ai_cache_ttl)
+
+# Section headers recognised by _parse_resume_structure, one precompiled
+# pattern per section tried in priority order — a header like "Professional
+# Summary" must classify as summary even though "professional" belongs to
+# experience, so a single leftmost-wins alternation is not equivalent.
+_SECTION_PATTERNS = (
+    ("contact", re.compile(r'contact|information|phone|email|linkedin', re.IGNORECASE)),
+    ("summary", re.compile(r'summary|objective|profile|about', re.IGNORECASE)),
+    ("experience", re.compile(r'experience|work|employment|professional', re.IGNORECASE)),
+    ("education", re.compile(r'education|academic|university|college', re.IGNORECASE)),
+    ("skills", re.compile(r'skills|technical|technologies|competencies', re.IGNORECASE)),
+    ("projects", re.compile(r'projects|portfolio', re.IGNORECASE)),
+)
+
+
+@functools.cache
+def _pdf_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """Workers for CPU-bound pdfminer parsing; created on first multi-page PDF."""
+    return concurrent.futures.ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+def _extract_page_text(file_content: bytes, page_no: int) -> str:
+    """Extract one page's text; runs inside a pool worker."""
+    with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+        return _page_text(pdf.pages[page_no])
+
+
+def _page_text(page) -> str:
+    """Text for one pdfplumber page, skipping the layout pass when the page
+    has no character objects (scanned/image-only pages)."""
+    try:
+        if not page.chars:
+            return ""
+        return page.extract_text() or ""
+    except Exception:
+        # A degenerate page should cost us its text, not the whole resume
+        return ""
+
+
+def _prompt_view(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Parsed content without the bulky text copies, for prompt serialization."""
+    return {k: v for k, v in content.items() if k not in ("raw_text", "_lower_text")}
+
+
+# ATS keyword and template tables are identical for every instance, so they
+# live at module scope and are built once per process.
+_ATS_KEYWORDS = {
+    "software_engineer": {
+        "technical": [
+            "python", "java", "javascript", "react", "node.js", "aws", "docker",
+            "kubernetes", "microservices", "api", "rest", "sql", "nosql",
+            "git", "ci/cd", "testing", "debugging", "algorithms", "data structures"
+        ],
+        "soft": [
+            "teamwork", "communication", "problem-solving", "leadership",
+            "agile", "scrum", "collaboration", "project management"
+        ],
+        "action_verbs": [
+            "developed", "implemented", "designed", "optimized", "led",
+            "architected", "deployed", "maintained", "tested", "refactored"
+        ]
+    },
+    "qa_engineer": {
+        "technical": [
+            "automation", "selenium", "cypress", "junit", "testng", "api testing",
+            "performance testing", "security testing", "manual testing", "bug tracking",
+            "jira", "testrail", "ci/cd", "regression testing"
+        ],
+        "soft": [
+            "attention to detail", "analytical thinking", "communication",
+            "documentation", "collaboration", "quality focus"
+        ],
+        "action_verbs": [
+            "tested", "automated", "identified", "documented", "verified",
+            "validated", "inspected", "ensured", "monitored", "reported"
+        ]
+    },
+    "product_manager": {
+        "technical": [
+            "product roadmap", "user research", "data analysis", "metrics",
+            "agile", "scrum", "market research", "competitor analysis",
+            "product analytics", "a/b testing", "user stories"
+        ],
+        "soft": [
+            "stakeholder management", "communication", "leadership",
+            "strategic thinking", "prioritization", "negotiation",
+            "presentation", "cross-functional collaboration"
+        ],
+        "action_verbs": [
+            "launched", "managed", "defined", "prioritized", "analyzed",
+            "researched", "presented", "coordinated", "drove", "optimized"
+        ]
+    }
+}
+
+_RESUME_TEMPLATES = {
+    "modern_template": {
+        "sections": ["contact", "summary", "experience", "skills", "education"],
+        "format": "clean",
+        "font": "Calibri",
+        "font_size": 11,
+        "margins": 1.0
+    },
+    "technical_template": {
+        "sections": ["contact", "summary", "technical_skills", "experience", "projects", "education"],
+        "format": "technical",
+        "font": "Consolas",
+        "font_size": 10,
+        "margins": 0.75
+    },
+    "best_practices": {
+        "max_length_pages": 2,
+        "bullet_points_per_experience": 3,
+        "quantify_achievements": True,
+        "use_action_verbs": True,
+        "tailor_to_job": True,
+        "include_metrics": True
+    }
+}
+
+# Per-role flattened, lowered keyword tuples plus one compiled alternation
+# each, so scoring and analysis cost a single scan over the resume text
+# instead of one substring search per keyword. The lookahead keeps
+# overlapping matches and the longest-first ordering prefers phrases over
+# their prefixes.
+_FLAT_KEYWORDS_LOWER: Dict[str, tuple] = {
+    role: tuple(
+        kw.lower()
+        for kw in groups["technical"] + groups["soft"] + groups["action_verbs"]
+    )
+    for role, groups in _ATS_KEYWORDS.items()
+}
+_KEYWORD_PATTERNS: Dict[str, re.Pattern] = {
+    role: re.compile(
+        "(?=("
+        + "|".join(re.escape(kw) for kw in sorted(set(keywords), key=len, reverse=True))
+        + "))"
+    )
+    for role, keywords in _FLAT_KEYWORDS_LOWER.items()
+}
+
+
+def _resume_lower(parsed_content: Dict[str, Any]) -> str:
+    """Lowercase the raw resume text once and cache it on the parsed dict."""
+    lower = parsed_content.get("_lower_text")
+    if lower is None:
+        lower = parsed_content.get("raw_text", "").lower()
+        parsed_content["_lower_text"] = lower
+    return lower
+
 
 class ResumeService:
     def __init__(self):
         self.ai_proxy = AIProxy()
-        self.ats_keywords = self._load_ats_keywords()
-        self.resume_templates = self._load_resume_templates()
-
-    def _load_ats_keywords(self) -> Dict[str, List[str]]:
-        """Load ATS keywords by role and industry"""
-        return {
-            "software_engineer": {
-                "technical": [
-                    "python", "java", "javascript", "react", "node.js", "aws", "docker",
-                    "kubernetes", "microservices", "api", "rest", "sql", "nosql",
-                    "git", "ci/cd", "testing", "debugging", "algorithms", "data structures"
-                ],
-                "soft": [
-                    "teamwork", "communication", "problem-solving", "leadership",
-                    "agile", "scrum", "collaboration", "project management"
-                ],
-                "action_verbs": [
-                    "developed", "implemented", "designed", "optimized", "led",
-                    "architected", "deployed", "maintained", "tested", "refactored"
-                ]
-            },
-            "qa_engineer": {
-                "technical": [
-                    "automation", "selenium", "cypress", "junit", "testng", "api testing",
-                    "performance testing", "security testing", "manual testing", "bug tracking",
-                    "jira", "testrail", "ci/cd", "regression testing"
-                ],
-                "soft": [
-                    "attention to detail", "analytical thinking", "communication",
-                    "documentation", "collaboration", "quality focus"
-                ],
-                "action_verbs": [
-                    "tested", "automated", "identified", "documented", "verified",
-                    "validated", "inspected", "ensured", "monitored", "reported"
-                ]
-            },
-            "product_manager": {
-                "technical": [
-                    "product roadmap", "user research", "data analysis", "metrics",
-                    "agile", "scrum", "market research", "competitor analysis",
-                    "product analytics", "a/b testing", "user stories"
-                ],
-                "soft": [
-                    "stakeholder management", "communication", "leadership",
-                    "strategic thinking", "prioritization", "negotiation",
-                    "presentation", "cross-functional collaboration"
-                ],
-                "action_verbs": [
-                    "launched", "managed", "defined", "prioritized", "analyzed",
-                    "researched", "presented", "coordinated", "drove", "optimized"
-                ]
-            }
-        }
+        self.ats_keywords = _ATS_KEYWORDS
+        self.resume_templates = _RESUME_TEMPLATES
+        self._flat_keywords_lower = _FLAT_KEYWORDS_LOWER
+        self._keyword_patterns = _KEYWORD_PATTERNS
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._flusher_task: Optional[asyncio.Task] = None
+
+    def _enqueue_write(self, collection: str, document: Dict[str, Any]) -> None:
+        """Queue a document for batched insertion, starting the flusher if idle."""
+        if self._write_queue is None:
+            self._write_queue = asyncio.Queue()
+        self._write_queue.put_nowait((collection, document))
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.create_task(self._flush_writes())
+
+    async def _flush_writes(self) -> None:
+        """Drain queued documents into insert_many batches; exits when idle."""
+        queue = self._write_queue
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=5.0)
+            except asyncio.TimeoutError:
+                return  # idle; _enqueue_write restarts us on the next write
+            batch: Dict[str, List[Dict[str, Any]]] = {}
+            count = 0
+            while True:
+                batch.setdefault(item[0], []).append(item[1])
+                count += 1
+                if count >= _WRITE_BATCH_SIZE:
+                    break
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=_WRITE_BATCH_WINDOW)
+                except asyncio.TimeoutError:
+                    break
+            db = get_database()
+            for collection, documents in batch.items():
+                try:
+                    await db[collection].insert_many(documents, ordered=False)
+                except Exception as e:
+                    logger.error(f"Batched insert into {collection} failed: {e}")
+
+    async def _cached_ai(self, prompt: str, method) -> str:
+        """Run an AI call through the prompt-keyed response cache"""
+        key = hashlib.sha1(prompt.encode()).hexdigest()
+        hit = _ai_response_cache.get(key)
+        if hit is not None:
+            return hit
+        response = await method(prompt)
+        _ai_response_cache[key] = response
+        return response
 
-    def _load_resume_templates(self) -> Dict[str, Any]:
-        """Load resume templates and best practices"""
-        return {
-            "modern_template": {
-                "sections": ["contact", "summary", "experience", "skills", "education"],
-                "format": "clean",
-                "font": "Calibri",
-                "font_size": 11,
-                "margins": 1.0
-            },
-            "technical_template": {
-                "sections": ["contact", "summary", "technical_skills", "experience", "projects", "education"],
-                "format": "technical",
-                "font": "Consolas",
-                "font_size": 10,
-                "margins": 0.75
-            },
-            "best_practices": {
-                "max_length_pages": 2,
-                "bullet_points_per_experience": 3,
-                "quantify_achievements": True,
-                "use_action_verbs": True,
-                "tailor_to_job": True,
-                "include_metrics": True
-            }
-        }
+    def _match_keywords(self, parsed_content: Dict[str, Any], target_role: str) -> Optional[tuple]:
+        """Run the role's matcher once, returning (keywords, found_set)."""
+        pattern = self._keyword_patterns.get(target_role)
+        if pattern is None:
+            return None
+        keywords = self._flat_keywords_lower[target_role]
+        text = _resume_lower(parsed_content)
+        found = set(pattern.findall(text))
+        # A keyword that only ever starts a longer matched keyword is hidden
+        # by the longest-first alternation; re-check just those few directly.
+        for kw in keywords:
+            if kw not in found and any(other.startswith(kw) for other in found):
+                found.add(kw)
+        return keywords, found
 
     async def parse_resume(self, file_content: bytes, file_type: str, target_role: str) -> ResumeUploadResponse:
         """Parse and analyze resume content"""
@@ -120,11 +293,12 @@ class ResumeService:
         # Check format compliance
         format_score = self._check_format_compliance(parsed_content)
 
-        # Create response
+        # Create response; the raw text (and its cached lowered copy) stays
+        # out of the payload — it is persisted aside for later optimization
         resume_id = str(uuid.uuid4())
         response = ResumeUploadResponse(
             resumeId=resume_id,
-            parsedContent=parsed_content,
+            parsedContent=_prompt_view(parsed_content),
             atsScore=ats_score,
             keywordMatches=keyword_analysis["matches"],
             missingKeywords=keyword_analysis["missing"],
@@ -133,7 +307,7 @@ class ResumeService:
         )
 
         # Save to database
-        await self._save_resume_analysis(resume_id, response.dict())
+        await self._save_resume_analysis(resume_id, response.model_dump(), resume_text)
 
         return response
 
@@ -142,16 +316,24 @@ class ResumeService:
         try:
             if file_type.lower() == "pdf":
                 with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        text += page.extract_text() + "\n"
-                return text
+                    num_pages = len(pdf.pages)
+                    if num_pages <= 1:
+                        return "\n".join(
+                            t for t in (_page_text(page) for page in pdf.pages) if t
+                        )
+                # Page extraction is CPU-bound pdfminer work, so fan
+                # multi-page documents out across worker processes and keep
+                # the event loop free for other uploads. The handle above is
+                # closed first; each worker reopens from the raw bytes.
+                loop = asyncio.get_running_loop()
+                texts = await asyncio.gather(*(
+                    loop.run_in_executor(_pdf_pool(), _extract_page_text, file_content, i)
+                    for i in range(num_pages)
+                ))
+                return "\n".join(t for t in texts if t)
             elif file_type.lower() in ["docx", "doc"]:
                 doc = docx.Document(io.BytesIO(file_content))
-                text = ""
-                for paragraph in doc.paragraphs:
-                    text += paragraph.text + "\n"
-                return text
+                return "\n".join(paragraph.text for paragraph in doc.paragraphs)
             elif file_type.lower() == "txt":
                 return file_content.decode("utf-8")
             else:
@@ -170,6 +352,7 @@ class ResumeService:
             "skills": [],
             "projects": [],
             "raw_text": resume_text,
+            "_lower_text": resume_text.lower(),
             "line_count": len(lines),
             "word_count": len(resume_text.split())
         }
@@ -183,18 +366,9 @@ class ResumeService:
                 continue
 
             # Identify section headers
-            section_headers = {
-                "contact": ["contact", "information", "phone", "email", "linkedin"],
-                "summary": ["summary", "objective", "profile", "about"],
-                "experience": ["experience", "work", "employment", "professional"],
-                "education": ["education", "academic", "university", "college"],
-                "skills": ["skills", "technical", "technologies", "competencies"],
-                "projects": ["projects", "portfolio", "work"]
-            }
-
             identified_section = None
-            for section, keywords in section_headers.items():
-                if any(keyword.lower() in line.lower() for keyword in keywords):
+            for section, pattern in _SECTION_PATTERNS:
+                if pattern.search(line):
                     identified_section = section
                     break
 
@@ -240,12 +414,13 @@ class ResumeService:
 
         for line in content:
             # Look for job title patterns (usually includes dates)
-            if re.search(r'\d{4}|\d{1,2}/\d{4}|present', line.lower()):
+            if _DATE_RE.search(line):
                 if current_exp:
                     experiences.append(current_exp)
 
-                # Parse job title, company, and dates
-                parts = line.split('|') or line.split('-') or [line]
+                # Parse job title, company, and dates; maxsplit keeps date
+                # ranges like "2020-2023" intact in the duration field
+                parts = _EXP_SEP_RE.split(line, maxsplit=2)
                 current_exp = {
                     "title": parts[0].strip() if parts else line.strip(),
                     "company": parts[1].strip() if len(parts) > 1 else "",
@@ -290,9 +465,9 @@ class ResumeService:
         skills = []
         for line in content:
             # Split by common delimiters
-            for skill in re.split(r'[,;|]', line):
+            for skill in line.translate(_SKILL_TRANS).split(','):
                 skill = skill.strip()
-                if skill and len(skill) > 1:
+                if len(skill) > 1:
                     skills.append(skill)
         return skills
 
@@ -324,26 +499,22 @@ class ResumeService:
         contact = {}
 
         # Email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
+        emails = _EMAIL_RE.findall(text)
         if emails:
             contact["email"] = emails[0]
 
         # Phone
-        phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b|\(\d{3}\)\s*\d{3}[-.]?\d{4}'
-        phones = re.findall(phone_pattern, text)
+        phones = _PHONE_RE.findall(text)
         if phones:
             contact["phone"] = phones[0]
 
         # LinkedIn
-        linkedin_pattern = r'linkedin\.com/in/[A-Za-z0-9-]+'
-        linkedin_matches = re.findall(linkedin_pattern, text)
+        linkedin_matches = _LINKEDIN_RE.findall(text)
         if linkedin_matches:
             contact["linkedin"] = "https://" + linkedin_matches[0]
 
         # GitHub
-        github_pattern = r'github\.com/[A-Za-z0-9-]+'
-        github_matches = re.findall(github_pattern, text)
+        github_matches = _GITHUB_RE.findall(text)
         if github_matches:
             contact["github"] = "https://" + github_matches[0]
 
@@ -374,24 +545,13 @@ class ResumeService:
 
     async def _calculate_keywords_score(self, parsed_content: Dict[str, Any], target_role: str) -> float:
         """Calculate keyword matching score"""
-        if target_role not in self.ats_keywords:
+        matched = self._match_keywords(parsed_content, target_role)
+        if matched is None:
             return 70  # Default score for unknown roles
 
-        role_keywords = self.ats_keywords[target_role]
-        all_keywords = (
-            role_keywords["technical"] +
-            role_keywords["soft"] +
-            role_keywords["action_verbs"]
-        )
-
-        resume_text = parsed_content.get("raw_text", "").lower()
-
-        found_keywords = 0
-        for keyword in all_keywords:
-            if keyword.lower() in resume_text:
-                found_keywords += 1
-
-        return (found_keywords / len(all_keywords)) * 100 if all_keywords else 0
+        keywords, found = matched
+        found_keywords = sum(1 for keyword in keywords if keyword in found)
+        return (found_keywords / len(keywords)) * 100 if keywords else 0
 
     def _calculate_structure_score(self, parsed_content: Dict[str, Any]) -> float:
         """Calculate resume structure score"""
@@ -413,21 +573,24 @@ class ResumeService:
         # Experience quality
         experiences = parsed_content.get("experience", [])
         if experiences:
-            # Check for quantified achievements
-            has_metrics = any(
-                any(re.search(r'\d+', desc) for desc in exp.get("description", []))
-                for exp in experiences
-            )
+            # Check quantified achievements and action verbs in one pass
+            action_verbs = ("developed", "implemented", "led", "managed", "created")
+            has_metrics = False
+            has_action_verbs = False
+            for exp in experiences:
+                for desc in exp.get("description", ()):
+                    if not has_metrics and _DIGIT_RE.search(desc):
+                        has_metrics = True
+                    if not has_action_verbs:
+                        desc_lower = desc.lower()
+                        if any(verb in desc_lower for verb in action_verbs):
+                            has_action_verbs = True
+                    if has_metrics and has_action_verbs:
+                        break
+                if has_metrics and has_action_verbs:
+                    break
             if has_metrics:
                 score += 30
-
-            # Check for action verbs
-            action_verbs = ["developed", "implemented", "led", "managed", "created"]
-            has_action_verbs = any(
-                any(verb in desc.lower() for desc in exp.get("description", []))
-                for exp in experiences
-                for verb in action_verbs
-            )
             if has_action_verbs:
                 score += 20
 
@@ -457,10 +620,11 @@ class ResumeService:
         # Check for common formatting issues
         raw_text = parsed_content.get("raw_text", "")
 
-        # Too many short lines (potential formatting issues)
+        # Too many short lines (potential formatting issues); content without
+        # raw text (e.g. AI-optimized output) has no lines to judge
         lines = [line for line in raw_text.split('\n') if line.strip()]
         short_lines = [line for line in lines if len(line.strip()) < 20]
-        if len(short_lines) / len(lines) > 0.3:
+        if lines and len(short_lines) / len(lines) > 0.3:
             score -= 15
 
         # Check for consistent formatting
@@ -472,28 +636,15 @@ class ResumeService:
 
     def _analyze_keywords(self, parsed_content: Dict[str, Any], target_role: str) -> Dict[str, Any]:
         """Analyze keyword matches and missing keywords"""
-        if target_role not in self.ats_keywords:
+        matched = self._match_keywords(parsed_content, target_role)
+        if matched is None:
             return {"matches": [], "missing": []}
 
-        role_keywords = self.ats_keywords[target_role]
-        all_keywords = (
-            role_keywords["technical"] +
-            role_keywords["soft"] +
-            role_keywords["action_verbs"]
-        )
-
-        resume_text = parsed_content.get("raw_text", "").lower()
-
-        matches = []
-        missing = []
-
-        for keyword in all_keywords:
-            if keyword.lower() in resume_text:
-                matches.append(keyword)
-            else:
-                missing.append(keyword)
-
-        return {"matches": matches, "missing": missing}
+        keywords, found = matched
+        return {
+            "matches": [keyword for keyword in keywords if keyword in found],
+            "missing": [keyword for keyword in keywords if keyword not in found],
+        }
 
     async def _generate_resume_improvements(
         self,
@@ -518,7 +669,7 @@ class ResumeService:
         experiences = parsed_content.get("experience", [])
         for i, exp in enumerate(experiences):
             descriptions = exp.get("description", [])
-            has_metrics = any(re.search(r'\d+', desc) for desc in descriptions)
+            has_metrics = any(_DIGIT_RE.search(desc) for desc in descriptions)
             if not has_metrics:
                 suggestions.append(f"Add quantifiable metrics to experience #{i+1}")
 
@@ -531,13 +682,13 @@ class ResumeService:
         - Number of Experiences: {len(experiences)}
 
         Resume content summary:
-        {json.dumps(parsed_content, indent=2)[:1000]}...
+        {json.dumps(_prompt_view(parsed_content), indent=2)[:1000]}...
 
         Provide 3-4 specific, actionable suggestions to improve this resume.
         """
 
         try:
-            ai_response = await self.ai_proxy.generate_resume_feedback(ai_prompt)
+            ai_response = await self._cached_ai(ai_prompt, self.ai_proxy.generate_resume_feedback)
             ai_suggestions = [s.strip() for s in ai_response.split('\n') if s.strip()]
             suggestions.extend(ai_suggestions[:3])
         except:
@@ -586,33 +737,42 @@ class ResumeService:
         if not original_analysis:
             raise ValueError("Resume not found")
 
+        # Analysis documents no longer carry the raw text; re-attach it from
+        # its own collection so rescoring the optimized content still sees
+        # the full resume on the fallback path
+        parsed_content = original_analysis["parsedContent"]
+        if "raw_text" not in parsed_content:
+            stored = await get_database().resume_raw_texts.find_one({"_id": resume_id})
+            if stored:
+                parsed_content["raw_text"] = stored["raw_text"]
+
         # Generate optimized content using AI
         optimized_content = await self._generate_optimized_content(
-            original_analysis["parsedContent"],
+            parsed_content,
             target_role,
             job_description
         )
 
+        # Calculate new ATS score
+        new_ats_score = await self._calculate_ats_score(optimized_content, target_role)
+
         # Calculate improvements
         improvements = self._calculate_improvements(
             original_analysis,
             optimized_content,
-            target_role
+            new_ats_score
         )
 
-        # Calculate new ATS score
-        new_ats_score = await self._calculate_ats_score(optimized_content, target_role)
-
         optimization = ResumeOptimization(
             resumeId=resume_id,
             targetRole=target_role,
-            optimizedContent=optimized_content,
+            optimizedContent=_prompt_view(optimized_content),
             improvements=improvements,
             newAtsScore=new_ats_score
         )
 
         # Save optimization
-        await self._save_resume_optimization(resume_id, optimization.dict())
+        await self._save_resume_optimization(resume_id, optimization.model_dump())
 
         return optimization
 
@@ -628,7 +788,7 @@ class ResumeService:
         Optimize this resume for a {target_role} position.
 
         Original resume content:
-        {json.dumps(original_content, indent=2)}
+        {json.dumps(_prompt_view(original_content), indent=2)}
 
         Job Description:
         {job_description or "Not provided"}
@@ -644,11 +804,19 @@ class ResumeService:
         """
 
         try:
-            ai_response = await self.ai_proxy.generate_resume_optimization(ai_prompt)
-            # Parse AI response
-            optimized_content = json.loads(ai_response)
-            return optimized_content
-        except:
+            ai_response = await self._cached_ai(ai_prompt, self.ai_proxy.generate_resume_optimization)
+        except Exception as e:
+            logger.warning(f"Resume optimization AI call failed: {e}")
+            return self._apply_basic_optimizations(original_content, target_role)
+
+        # Models often wrap JSON in a ```json fence; strip it before parsing
+        # rather than falling through to the basic-optimization path
+        response = ai_response.strip()
+        response = response.removeprefix("```json").removeprefix("```")
+        response = response.removesuffix("```").strip()
+        try:
+            return json.loads(response)
+        except json.JSONDecodeError:
             # Fallback: return slightly modified original content
             return self._apply_basic_optimizations(original_content, target_role)
 
@@ -669,14 +837,13 @@ class ResumeService:
         self,
         original: Dict[str, Any],
         optimized: Dict[str, Any],
-        target_role: str
+        new_score: float
     ) -> List[Dict[str, Any]]:
         """Calculate specific improvements made"""
         improvements = []
 
         # ATS score improvement
         original_score = original.get("atsScore", 0)
-        new_score = self._calculate_ats_score(optimized, target_role)
         if new_score > original_score:
             improvements.append({
                 "type": "ats_score",
@@ -706,12 +873,12 @@ class ResumeService:
 
         return improvements
 
-    async def _save_resume_analysis(self, resume_id: str, analysis: Dict[str, Any]) -> None:
-        """Save resume analysis to database"""
-        db = get_database()
+    async def _save_resume_analysis(self, resume_id: str, analysis: Dict[str, Any], raw_text: str) -> None:
+        """Queue resume analysis for batched persistence, raw text stored aside"""
         analysis["_id"] = resume_id
         analysis["createdAt"] = datetime.utcnow()
-        await db.resume_analyses.insert_one(analysis)
+        self._enqueue_write("resume_analyses", analysis)
+        self._enqueue_write("resume_raw_texts", {"_id": resume_id, "raw_text": raw_text})
 
     async def _get_resume_analysis(self, resume_id: str) -> Optional[Dict[str, Any]]:
         """Get resume analysis from database"""
@@ -719,8 +886,7 @@ class ResumeService:
         return await db.resume_analyses.find_one({"_id": resume_id})
 
     async def _save_resume_optimization(self, resume_id: str, optimization: Dict[str, Any]) -> None:
-        """Save resume optimization to database"""
-        db = get_database()
+        """Queue resume optimization for batched persistence"""
         optimization["_id"] = f"{resume_id}_optimized"
         optimization["createdAt"] = datetime.utcnow()
-        await db.resume_optimizations.insert_one(optimization)
\ No newline at end of file
+        self._enqueue_write("resume_optimizations", optimization)
\ No newline at end of file
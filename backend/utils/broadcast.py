@@ -1,31 +1,56 @@
-from typing import Dict, Set
+import asyncio
+import json
+from typing import Dict, List, Set
 from fastapi import WebSocket
 
 
 class InMemoryBroker:
     def __init__(self) -> None:
-        self.rooms: Dict[str, Set[WebSocket]] = {}
+        # Broadcast iterates far more often than membership changes, so each
+        # room keeps its sockets in a list (contiguous, ordered iteration for
+        # emit) with a parallel set of socket ids for O(1) join/leave checks.
+        self.rooms: Dict[str, List[WebSocket]] = {}
+        self._room_ids: Dict[str, Set[int]] = {}
 
     async def join(self, room: str, ws: WebSocket) -> None:
-        self.rooms.setdefault(room, set()).add(ws)
+        ids = self._room_ids.setdefault(room, set())
+        if id(ws) not in ids:
+            ids.add(id(ws))
+            self.rooms.setdefault(room, []).append(ws)
 
     async def leave(self, room: str, ws: WebSocket) -> None:
-        if room in self.rooms:
-            self.rooms[room].discard(ws)
-            if not self.rooms[room]:
-                del self.rooms[room]
+        ids = self._room_ids.get(room)
+        if ids is None or id(ws) not in ids:
+            return
+        self._drop(room, {id(ws)})
+
+    def _drop(self, room: str, dead_ids: Set[int]) -> None:
+        ids = self._room_ids[room]
+        ids.difference_update(dead_ids)
+        if ids:
+            self.rooms[room] = [s for s in self.rooms[room] if id(s) not in dead_ids]
+        else:
+            del self.rooms[room]
+            del self._room_ids[room]
 
     async def emit(self, room: str, message: dict) -> None:
-        if room not in self.rooms:
+        sockets = list(self.rooms.get(room, ()))
+        if not sockets:
             return
-        dead: Set[WebSocket] = set()
-        for ws in self.rooms[room]:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.add(ws)
-        for d in dead:
-            await self.leave(room, d)
+        # Serialize once and send concurrently: send_json re-encodes the
+        # payload per socket, and awaiting sends one at a time makes the
+        # broadcast latency grow with the room size. send_text keeps the
+        # same text frames (and compact encoding) send_json produced.
+        frame = json.dumps(message, separators=(",", ":"))
+        results = await asyncio.gather(
+            *(ws.send_text(frame) for ws in sockets), return_exceptions=True
+        )
+        dead_ids = {
+            id(ws) for ws, result in zip(sockets, results)
+            if isinstance(result, Exception)
+        }
+        if dead_ids and room in self._room_ids:
+            self._drop(room, dead_ids)
 
 
 broker = InMemoryBroker()